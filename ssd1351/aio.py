@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# aio.py from https://github.com/saidalvarado/ssd1351
+#
+# asyncio front end for the SSD1351 driver (Python 3 only).
+#
+# The transfers to the screen take tens of milliseconds, which would
+# block the event loop. AsyncSSD1351 runs every call of the driver on a
+# worker thread, one after the other in the order they were made, and
+# gives back an awaitable, so the other coroutines keep running while
+# the panel updates.
+#
+# Updates can be given a key (see update()): a new update with the same
+# key cancels the previous one if it didn't start yet, because it would
+# be overwritten anyway. display() does this by itself, the display()
+# that was cancelled just waits for the newer one.
+#
+# Usage:
+#     aoled = AsyncSSD1351(ssd1351.SSD1351(buffered = True))
+#     await aoled.begin()
+#     await aoled.fillScreen(aoled.BLACK)
+#     await aoled.write("21.5 C")
+#     await aoled.display()
+#
+#----------------------------------------------------------------------
+
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+
+
+
+
+class AsyncSSD1351:
+    """ Wraps an SSD1351 display: every method of the display becomes a coroutine function that runs
+        it on a worker thread. The attributes that are not methods (e.g. the colors) are given as
+        they are.
+
+        Only the worker thread should touch the display once it's wrapped, drawing included.
+    """
+
+    def __init__(self, oled, executor = None):
+        """ executor runs the calls, a single thread is used by default so they run in order. """
+        self.oled = oled
+        self.own_executor = executor is None
+        self.executor = executor if executor is not None else ThreadPoolExecutor(max_workers = 1)
+        self.updates = {}             #The latest update of each key
+
+
+    def __getattr__(self, name):
+        value = getattr(self.oled, name)
+        if not callable(value):
+            return value
+
+        @functools.wraps(value)
+        async def method(*args, **kwargs):
+            return await self.call(value, *args, **kwargs)
+        return method
+
+
+    async def call(self, function, *args, **kwargs):
+        """ Runs function(*args, **kwargs) on the worker thread and returns its result. """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+
+    async def update(self, key, function, *args, **kwargs):
+        """ Like call(), but a later update with the same key supersedes this one: if it didn't
+            start yet it's cancelled, and awaiting it raises asyncio.CancelledError.
+        """
+        return await self.keyedUpdate(key, False, functools.partial(function, *args, **kwargs))
+
+
+    async def keyedUpdate(self, key, follow, function):
+        """ *NOT PART OF THE API*
+            Runs an update that supersedes the previous one with the same key. With "follow" a
+            superseded update waits for the one that replaced it instead of raising, and runs
+            after all if that one is cancelled by its caller.
+        """
+        previous = self.updates.get(key)
+        superseded = previous is not None and previous.cancel()      #False if it's running or done
+
+        future = self.executor.submit(function)
+        self.updates[key] = future
+        if superseded:
+            previous.replaced_by = future
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            newer = getattr(future, 'replaced_by', None)
+            if not follow or newer is None:
+                raise
+        finally:
+            if self.updates.get(key) is future:
+                del self.updates[key]
+
+        #Whatever it would have sent goes with the newer one
+        while True:
+            try:
+                #Shielded, cancelling this coroutine must not cancel someone else's update
+                await asyncio.shield(asyncio.wrap_future(newer))
+                return None
+            except asyncio.CancelledError:
+                if not newer.cancelled():
+                    raise
+            if getattr(newer, 'replaced_by', None) is not None:
+                newer = newer.replaced_by
+            else:
+                #Its caller gave up on it, nobody else is going to send this
+                return await self.keyedUpdate(key, follow, function)
+
+
+    async def display(self, full = False):
+        """ Sends the frame_buffer to the screen (see SSD1351.display()). A display() waiting for
+            its turn is cancelled by a newer one, that sends its changes too. A full resend is only
+            cancelled by a newer full resend, a display() of the changes doesn't replace it.
+        """
+        key = 'display full' if full else 'display'
+        return await self.keyedUpdate(key, True, functools.partial(self.oled.display, full))
+
+    #Same thing, different name
+    flush = display
+
+
+    def close(self):
+        """ Stops the worker thread, once every pending call is done. """
+        if self.own_executor:
+            self.executor.shutdown(wait = True)
@@ -0,0 +1,363 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# animation.py from https://github.com/saidalvarado/ssd1351
+#
+# Delta-encoded animations for the SSD1351 driver.
+#
+# Consecutive frames of an animation usually differ only on a small
+# area. encodeAnimation() finds, once and ahead of time, the rectangles
+# that change from each frame to the next (planned with the same
+# transfer cost model that display() uses), and keeps only their
+# pixels, already as big-endian bytes. AnimationPlayer then sends only
+# those rectangles, instead of the whole frame every time.
+#
+# Usage:
+#     animation = encodeAnimation(frames)       # RGB or 16bit frames
+#     player = AnimationPlayer(oled, animation, 0, 29)
+#     player.play(loops = 10, fps = 12)
+#
+# FramePlayer plays frames as they come from any iterator (e.g. a video
+# being decoded) at a fixed rate. A worker thread prepares the next
+# frames while the current one is being sent, and the frames that would
+# be shown too late are skipped when a newer one is ready.
+#
+#     player = FramePlayer(oled, frames, 0, 29, fps = 12)
+#     print(player.play())
+#
+#----------------------------------------------------------------------
+
+
+import threading
+import time
+
+import numpy as np
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+import ssd1351
+from colors import convertBitmap565
+
+
+
+
+
+class Animation:
+    """ An encoded animation (see encodeAnimation()).
+
+        width, height  => size of the frames, in pixels
+        patches        => one list per frame with the (x, y, bitmap) rectangles that turn the
+                          previous frame into it. The bitmaps are big-endian 16bit colors.
+                          The patches of the first frame turn the last frame into it, to loop.
+        keyframes      => numbers of the frames stored whole, instead of as changes
+    """
+
+    def __init__(self, width, height, first, patches, keyframes):
+        self.width = width
+        self.height = height
+        self.first = first
+        self.patches = patches
+        self.keyframes = keyframes
+
+    def __len__(self):
+        return len(self.patches)
+
+    def pixels(self, i):
+        """ Returns the pixels sent to show the frame i after the frame i-1. """
+        return sum(bitmap.size for x, y, bitmap in self.patches[i])
+
+
+
+def encodeAnimation(frames, keyframe_interval = 0, window_cost = ssd1351.SSD1351.WINDOW_COST, pixel_cost = ssd1351.SSD1351.PIXEL_COST):
+    """ Encodes the frames of an animation as the rectangles that change from one frame to the next.
+
+
+    Parameters
+    ----------
+    frames : list of ndarrays, ndarray.
+        Frames of the animation, all the same size, RGB or already in 16bit color (anything
+        convertBitmap565() takes, also a stack of frames).
+
+    keyframe_interval : int.
+        Every "keyframe_interval" frames one is stored whole (0 => none). A keyframe makes the
+        screen right again if something was drawn over the animation.
+        default => 0
+
+    window_cost, pixel_cost : float.
+        Transfer cost model used to plan the rectangles, as in planWindows() of ssd1351.py.
+        default => the ones of the SSD1351 class
+
+    Returns
+    --------
+    out : Animation.
+
+    """
+    frames = [np.asarray(convertBitmap565(frame), dtype=np.uint16) for frame in frames]
+    height, width = frames[0].shape
+
+    keyframes = []
+    patches = []
+    for i, frame in enumerate(frames):
+        if keyframe_interval and i % keyframe_interval == 0 and i > 0:
+            keyframes.append(i)
+            patches.append([(0, 0, np.ascontiguousarray(frame, dtype='>u2'))])
+            continue
+
+        #Changes against the previous frame, the first one against the last (the loop)
+        patches.append(framePatches(frame, frames[i - 1], window_cost, pixel_cost))
+
+    first = np.ascontiguousarray(frames[0], dtype='>u2')
+    return Animation(width, height, first, patches, keyframes)
+
+
+def framePatches(frame, previous, window_cost, pixel_cost):
+    """ *NOT PART OF THE API*
+        Returns the (x, y, bitmap) rectangles that turn the 16bit color frame "previous" into
+        "frame", planned with planWindows(). The bitmaps are big-endian, ready to be sent.
+    """
+    patches = []
+    for x, y, w, h in ssd1351.planWindows(frame != previous, window_cost, pixel_cost):
+        patches.append((x, y, np.ascontiguousarray(frame[y:y+h, x:x+w], dtype='>u2')))
+    return patches
+
+
+
+
+
+class AnimationPlayer:
+    """ Shows an encoded animation on a display, at (x, y), sending only what changes from one
+        frame to the next. The first frame shown is always sent whole.
+    """
+
+    def __init__(self, oled, animation, x = 0, y = 0):
+        self.oled = oled
+        self.animation = animation
+        self.x = x
+        self.y = y
+        self.frame = None           #Frame on the screen
+
+    def show(self, i):
+        """ Draws the frame i. Only the changes are sent when it's the one that follows the frame
+            on the screen, otherwise the whole frame (e.g. the first call, or a jump).
+        """
+        oled = self.oled
+        animation = self.animation
+        i %= len(animation)
+
+        with oled.writing():
+            if self.frame is not None and i == (self.frame + 1) % len(animation):
+                for px, py, bitmap in animation.patches[i]:
+                    oled.drawBitmap(bitmap, self.x + px, self.y + py)
+            elif i == 0:
+                oled.drawBitmap(animation.first, self.x, self.y)
+            else:
+                #Jump: the keyframe before it, and every change from there on
+                start = max([k for k in animation.keyframes if k <= i] or [0])
+                oled.drawBitmap(animation.patches[start][0][2] if start else animation.first, self.x, self.y)
+                for j in range(start + 1, i + 1):
+                    for px, py, bitmap in animation.patches[j]:
+                        oled.drawBitmap(bitmap, self.x + px, self.y + py)
+            if oled.buffered:
+                oled.display()
+        self.frame = i
+
+    def step(self):
+        """ Draws the next frame. """
+        self.show(0 if self.frame is None else self.frame + 1)
+
+    def play(self, loops = 1, fps = None):
+        """ Plays the animation "loops" times, at "fps" frames per second, or as fast as the display
+            can take it when fps is None. No frame is skipped: when the display can't keep up with
+            the fps, the frames are shown as soon as possible.
+        """
+        deadline = ssd1351.clock()
+        for i in range(loops * len(self.animation)):
+            if fps is not None:
+                now = ssd1351.clock()
+                if now < deadline:
+                    time.sleep(deadline - now)
+                else:
+                    deadline = now
+                deadline += 1.0 / fps
+            self.step()
+
+    def reset(self):
+        """ Forgets what is on the screen, the next frame will be sent whole. """
+        self.frame = None
+
+
+
+
+
+class FramePlayer:
+    """ Plays the frames of an iterator on a display, at (x, y), at a fixed rate.
+
+        A worker thread converts the frames (see "prepare") and finds what changed from one to
+        the next, while the frame before is being sent. Each frame has its time to be shown, the
+        player waits for it, and a frame more than a frame late is skipped if the next one is
+        ready already. When the frames come slower than "fps" they are shown as they come.
+        Only what changed is sent when the previous frame was shown, the whole frame otherwise.
+    """
+
+    def __init__(self, oled, frames, x = 0, y = 0, fps = 10, prepare = None, depth = 2,
+                 window_cost = ssd1351.SSD1351.WINDOW_COST, pixel_cost = ssd1351.SSD1351.PIXEL_COST):
+        """ frames is any iterable of frames. prepare turns each one into a 16bit color bitmap,
+            convertBitmap565() by default. depth is the number of frames prepared in advance.
+        """
+        self.oled = oled
+        self.frames = frames
+        self.x = x
+        self.y = y
+        self.fps = fps
+        self.prepare = prepare if prepare is not None else convertBitmap565
+        self.window_cost = window_cost
+        self.pixel_cost = pixel_cost
+        self.depth = max(depth, 1)
+        self.queue = None
+        self.stopped = False
+        self.error = None
+        self.played = 0
+        self.dropped = 0
+        self.seconds = 0.0
+
+    def produce(self):
+        """ *NOT PART OF THE API*
+            Worker thread: prepares every frame as (bitmap, patches against the previous frame).
+        """
+        previous = None
+        try:
+            for frame in self.frames:
+                if self.stopped:
+                    break
+                bitmap = np.asarray(self.prepare(frame), dtype=np.uint16)
+                patches = None
+                if previous is not None and previous.shape == bitmap.shape:
+                    patches = framePatches(bitmap, previous, self.window_cost, self.pixel_cost)
+                previous = bitmap
+                self.put((np.ascontiguousarray(bitmap, dtype='>u2'), patches))
+        except Exception as e:
+            self.error = e
+        #The end of the frames
+        self.put(None)
+
+    def put(self, item):
+        """ *NOT PART OF THE API*
+            Waits for room on the queue, unless the player is stopped.
+        """
+        while not self.stopped:
+            try:
+                self.queue.put(item, timeout = 0.1)
+                return
+            except queue.Full:
+                pass
+
+    def play(self, count = None):
+        """ Plays the frames until they end, "count" frames were taken, or stop() is called.
+
+
+        Parameters
+        ----------
+        count : int.
+            Frames to take from the iterator (shown or skipped), None for all of them.
+            default => None
+
+        Returns
+        --------
+        out : dictionary.
+            The statistics of the playback, see stats().
+
+        """
+        period = 1.0 / self.fps
+        self.stopped = False
+        self.queue = queue.Queue(self.depth)
+        worker = threading.Thread(target = self.produce)
+        worker.daemon = True
+        worker.start()
+
+        first = None                #When the first frame came
+        deadline = None             #Time for the next frame to be shown
+        shown = False               #The previous frame is on the screen
+        late = None                 #The latest frame skipped
+        n = 0
+        try:
+            while not self.stopped and (count is None or n < count):
+                try:
+                    item = self.queue.get(timeout = 0.1)
+                except queue.Empty:
+                    continue
+                if item is None:
+                    if not shown and late is not None:
+                        #The last frame is shown even if it's late
+                        self.draw(late, None, False)
+                        self.dropped -= 1
+                        deadline = ssd1351.clock() + period
+                    break
+                bitmap, patches = item
+                n += 1
+
+                now = ssd1351.clock()
+                if deadline is None:
+                    #The time counts from the first frame, not from when the worker started
+                    first = deadline = now
+                if now > deadline + period and self.queue.qsize() > 0:
+                    #Too late, and the next one is ready already
+                    self.dropped += 1
+                    shown = False
+                    late = bitmap
+                    deadline += period
+                    continue
+                if now < deadline:
+                    time.sleep(deadline - now)
+                elif now > deadline + period:
+                    #The frames come slower than the fps, follow them instead of skipping all
+                    deadline = now
+
+                self.draw(bitmap, patches, shown)
+                shown = True
+                deadline += period
+        finally:
+            #The last frame stays on the screen for its whole period
+            if first is not None:
+                self.seconds += max(ssd1351.clock(), deadline) - first
+            self.stopped = True
+            worker.join()
+        if self.error is not None:
+            raise self.error
+        return self.stats()
+
+    def draw(self, bitmap, patches, shown):
+        """ *NOT PART OF THE API*
+            Sends a frame, only its changes if the previous frame is on the screen.
+        """
+        oled = self.oled
+        with oled.writing():
+            if shown and patches is not None:
+                for px, py, patch in patches:
+                    oled.drawBitmap(patch, self.x + px, self.y + py)
+            else:
+                oled.drawBitmap(bitmap, self.x, self.y)
+            if oled.buffered:
+                oled.display()
+        self.played += 1
+
+    def stop(self):
+        """ Stops the playback (e.g. from another thread). """
+        self.stopped = True
+
+    def stats(self):
+        """ Returns the statistics of the playback so far, as a dictionary.
+
+            frames    => frames shown
+            dropped   => frames skipped because they were late
+            seconds   => time spent playing
+            fps       => frames shown per second
+        """
+        return {
+            'frames': self.played,
+            'dropped': self.dropped,
+            'seconds': self.seconds,
+            'fps': self.played / self.seconds if self.seconds > 0 else 0.0,
+        }
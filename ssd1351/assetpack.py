@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# assetpack.py from https://github.com/saidalvarado/ssd1351
+#
+# A single file holding many images (icons, splash screens, sprite
+# sheets...) already converted to 16bit color and stored in the order
+# the screen wants them (big-endian RGB565).
+#
+# The file is opened with mmap, so nothing is decoded nor converted at
+# startup, only the images actually drawn are read from the disk, and
+# each image is a Numpy view of the file that drawBitmap() sends as it is.
+#
+# Format (all the numbers big-endian):
+#     8 bytes    "SSD1351P"
+#     4 bytes    length of the index
+#     index      JSON: {name: [offset, width, height], ...}
+#     images     the pixels of every image, row by row, 2 bytes each.
+#                The offsets are counted from the start of the file.
+#
+# Usage:
+#     writeAssetPack('assets.pack', {'splash': splash, 'icon': icon})
+#     pack = AssetPack('assets.pack')
+#     oled.drawBitmap(pack['splash'], 0, 0)
+#
+# Or, from the command line (it needs PIL to read the images):
+#     python assetpack.py assets.pack splash.png icon.png
+#
+#----------------------------------------------------------------------
+
+
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+from colors import convertBitmap565
+
+
+
+MAGIC = b'SSD1351P'
+HEADER = struct.Struct('>8sI')
+
+
+
+def writeAssetPack(path, images):
+    """ Writes an asset pack.
+
+        images is a dictionary (or a list of (name, image) tuples) of images, RGB(A) or already in
+        16bit color, as accepted by convertBitmap565().
+    """
+    if isinstance(images, dict):
+        images = sorted(images.items())
+
+    #Every image as big-endian bytes, and where it will go
+    index = {}
+    blobs = []
+    offset = 0
+    for name, image in images:
+        bitmap = convertBitmap565(image)
+        if bitmap.ndim != 2:
+            raise ValueError('The image "' + str(name) + '" is not a single 2-dimensional image')
+        blob = np.ascontiguousarray(bitmap, dtype='>u2')
+        index[name] = [offset, bitmap.shape[1], bitmap.shape[0]]
+        blobs.append(blob)
+        offset += blob.nbytes
+
+    #The offsets on the index count from the start of the file, so its size has to be known first
+    start = 0
+    while True:
+        table = json.dumps(dict((name, [o + start, w, h]) for name, (o, w, h) in index.items()), sort_keys=True).encode('utf-8')
+        table += b' ' * ((HEADER.size + len(table)) % 2)        #The pixels start on an even byte
+        if HEADER.size + len(table) == start:
+            break
+        start = HEADER.size + len(table)
+
+    with open(path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, len(table)))
+        f.write(table)
+        for blob in blobs:
+            f.write(blob.tobytes())
+
+
+
+
+
+class AssetPack:
+    """ An asset pack opened with mmap (see writeAssetPack()).
+
+        pack[name] returns the image as a (height, width) ndarray of big-endian 16bit colors,
+        that is a view of the file (no copy is made), ready for drawBitmap().
+        The images are only valid while the pack is open.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, length = HEADER.unpack(self.map[:HEADER.size])
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(str(path) + ' is not an asset pack')
+        self.index = json.loads(self.map[HEADER.size:HEADER.size + length].decode('utf-8'))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def __getitem__(self, name):
+        offset, w, h = self.index[name]
+        return np.frombuffer(self.map, dtype='>u2', count=w * h, offset=offset).reshape(h, w)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def names(self):
+        """ Returns the names of the images, sorted. """
+        return sorted(self.index)
+
+    def size(self, name):
+        """ Returns the (width, height) of an image, in pixels. """
+        offset, w, h = self.index[name]
+        return (w, h)
+
+    def close(self):
+        """ Closes the file. The images taken from the pack must not be used afterwards. """
+        if self.map is not None:
+            try:
+                self.map.close()
+            except BufferError:
+                #Some images are still in use, the map is closed once they are gone
+                pass
+            self.map = None
+        self.file.close()
+
+
+
+
+
+def main():
+    from PIL import Image
+    if len(sys.argv) < 3:
+        print('Usage: python assetpack.py output.pack image.png [image.png ...]')
+        return
+    images = []
+    for path in sys.argv[2:]:
+        name = os.path.splitext(os.path.basename(path))[0]
+        images.append((name, np.asarray(Image.open(path).convert('RGBA'))))
+    writeAssetPack(sys.argv[1], images)
+
+
+if __name__ == '__main__':
+    main()
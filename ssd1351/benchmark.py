@@ -0,0 +1,342 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# benchmark.py from https://github.com/saidalvarado/ssd1351
+#
+# Benchmarks every drawing function of the SSD1351 driver, and the
+# scenes of the examples. No screen is needed: the time is measured on
+# a transport that just swallows the data, and the traffic is counted
+# on the emulated display (emulator.py), in a separate run.
+#
+# For every workload, in immediate and in buffered mode (including the
+# display() call), it reports:
+#     calls, wall time of the Python side, pixels/sec,
+#     SPI transactions, bytes sent and DC toggles (totals and per call)
+#
+# Usage:
+#     python benchmark.py                      (prints a table)
+#     python benchmark.py -o results.json      (also saves the results)
+#     python benchmark.py -k write -k fill     (only the matching workloads)
+#
+# The JSON files of two versions can be compared with
+#     python benchmark.py --compare old.json new.json
+#
+#----------------------------------------------------------------------
+
+
+import argparse
+import json
+import os
+import platform
+import time
+
+import numpy as np
+
+import ssd1351
+from animation import encodeAnimation, AnimationPlayer
+from emulator import SSD1351Emulator
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+
+EXAMPLES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'examples')
+
+LOREM = ("Lorem ipsum dolor sit amet, consectetur adipiscing elit. Phasellus placerat diam tincidunt purus "
+         "imperdiet, nec maximus orci posuere. Duis egestas mattis nunc. In ultricies nunc vel elit imperdiet "
+         "mollis. Donec pulvinar mollis odio pellentesque pharetra. Vestibulum ante ipsum primis in faucibus "
+         "orci luctus et ultrices posuere cubilia")
+
+
+
+def loadFrames():
+    """ Loads the frames of the PBJT example as (90, 120, 3) RGB arrays. Without PIL, a synthetic
+        animation of the same size (a block moving over a gradient) is used instead.
+    """
+    folder = os.path.join(EXAMPLES, 'PBJT')
+    if Image is not None:
+        frames = []
+        for i in range(8):
+            path = os.path.join(folder, 'frame_' + str(i) + '.png')
+            if os.path.exists(path):
+                frames.append(np.asarray(Image.open(path).convert('RGB')))
+        if frames:
+            return frames
+
+    yy, xx = np.mgrid[0:90, 0:120]
+    background = np.dstack((xx * 2, yy * 2, 255 - xx * 2)).astype(np.uint8)
+    frames = []
+    for i in range(8):
+        frame = background.copy()
+        frame[30:60, 10 + i * 12:40 + i * 12] = (255, 255, 0)
+        frames.append(frame)
+    return frames
+
+
+
+#### Workloads ###
+# Every workload draws on the driver and returns the number of calls it made
+
+def fillScreenWorkload(oled, data):
+    for color in (oled.RED, oled.GREEN, oled.BLUE, oled.BLACK):
+        oled.fillScreen(color)
+    return 4
+
+def fillRectWorkload(oled, data):
+    colors = (oled.WHITE, oled.YELLOW, oled.CYAN, oled.GREEN, oled.MAGENTA, oled.RED, oled.BLUE, oled.BLACK)
+    for i, color in enumerate(colors):
+        oled.fillRect(i * 16, 0, 16, 100, color)
+    return len(colors)
+
+def drawLineWorkload(oled, data):
+    for i in range(8):
+        oled.drawLine(0, 0, i * 16, 127, oled.CYAN)
+    for i in range(8):
+        oled.drawLine(0, 0, 127, i * 16, oled.CYAN)
+    return 16
+
+def drawCircleWorkload(oled, data):
+    for r in range(5, 65, 5):
+        oled.drawCircle(64, 64, r, oled.GREEN)
+    return 12
+
+def fillCircleWorkload(oled, data):
+    for i, r in enumerate(range(60, 0, -10)):
+        oled.fillCircle(64, 64, r, (oled.RED, oled.WHITE)[i % 2])
+    return 6
+
+def fillTriangleWorkload(oled, data):
+    oled.fillTriangle(64, 0, 32, 64, 96, 64, oled.YELLOW)
+    oled.fillTriangle(0, 127, 32, 64, 64, 127, oled.YELLOW)
+    oled.fillTriangle(64, 127, 127, 127, 96, 64, oled.YELLOW)
+    return 3
+
+def drawRoundRectWorkload(oled, data):
+    for i in range(8):
+        oled.drawRoundRect(i * 4, i * 4, 128 - i * 8, 128 - i * 8, 10, oled.MAGENTA)
+    return 8
+
+def writeWorkload(oled, data):
+    oled.setCursor(0, 0)
+    oled.write(LOREM)
+    return len(LOREM)
+
+def drawBitmapWorkload(oled, data):
+    for frame in data['frames565']:
+        oled.drawBitmap(frame, 0, 29)
+    return len(data['frames565'])
+
+def convertBitmap565Workload(oled, data):
+    for frame in data['frames']:
+        oled.convertBitmap565(frame)
+    return len(data['frames'])
+
+# The scenes of the examples, without the pauses
+
+def basicShapesScene(oled, data):
+    """ examples/Drawing_Basic_figures/basic_shapes.py """
+    calls = 0
+    #TV COLOR BARS
+    colors = (oled.WHITE, oled.YELLOW, oled.CYAN, oled.GREEN, oled.MAGENTA, oled.RED, oled.BLUE, oled.BLACK)
+    for i, color in enumerate(colors):
+        oled.fillRect(i * 16, 0, 16, 100, color)
+    for i, gray in enumerate((0, 80, 170, 255)):
+        oled.fillRect(i * 32, 100, 32, 28, oled.color565((gray, gray, gray)))
+    oled.fillScreen(0x000)
+    calls += 13
+    #SHOOTING TARGET
+    for i, r in enumerate(range(60, 0, -10)):
+        oled.fillCircle(64, 64, r, (oled.RED, oled.WHITE)[i % 2])
+    oled.fillScreen(0x00)
+    calls += 7
+    #RADIATING LINES
+    for i in range(8):
+        oled.drawLine(0, 0, i * 16, 128, oled.CYAN)
+    for i in range(8):
+        oled.drawLine(0, 0, 128, i * 16, oled.CYAN)
+    oled.fillScreen(0x00)
+    calls += 17
+    #TRIFORCE
+    oled.fillTriangle(64, 0, 32, 64, 96, 64, oled.YELLOW)
+    oled.fillTriangle(0, 128, 32, 64, 64, 128, oled.YELLOW)
+    oled.fillTriangle(64, 128, 128, 128, 96, 64, oled.YELLOW)
+    oled.fillScreen(0x00)
+    calls += 4
+    return calls
+
+def writingTextScene(oled, data):
+    """ examples/Writing_text/writing_text.py """
+    oled.setCursor(0, 0)
+    oled.write("Hello, world!")
+    oled.setCursor(8, 8)
+    oled.write("This is the center", oled.CYAN, oled.MAGENTA)
+    oled.setCursor(0, 0)
+    oled.write("Oops! overwritting\n", oled.GREEN)
+    oled.write("second line!", oled.GREEN)
+    oled.setCursor(0, 0)
+    oled.write(LOREM)
+    oled.fillScreen(0x00)
+    oled.setCursor(0, 0)
+    return 9
+
+def pbjtScene(oled, data):
+    """ examples/PBJT/pbjt_gif.py, two loops of the animation """
+    oled.setCursor(0, 0)
+    oled.write("     Peanut Butter \n      Jelly Time!")
+    for i in range(2):
+        for frame in data['frames565']:
+            oled.drawBitmap(frame, 0, 29)
+    return 1 + 2 * len(data['frames565'])
+
+def pbjtDeltaScene(oled, data):
+    """ The PBJT scene played as a delta-encoded animation (animation.py) """
+    oled.setCursor(0, 0)
+    oled.write("     Peanut Butter \n      Jelly Time!")
+    player = AnimationPlayer(oled, data['animation'], 0, 29)
+    player.play(loops = 2)
+    return 1 + 2 * len(data['animation'])
+
+
+WORKLOADS = [
+    ('fillScreen', fillScreenWorkload),
+    ('fillRect', fillRectWorkload),
+    ('drawLine', drawLineWorkload),
+    ('drawCircle', drawCircleWorkload),
+    ('fillCircle', fillCircleWorkload),
+    ('fillTriangle', fillTriangleWorkload),
+    ('drawRoundRect', drawRoundRectWorkload),
+    ('write', writeWorkload),
+    ('drawBitmap', drawBitmapWorkload),
+    ('convertBitmap565', convertBitmap565Workload),
+    ('scene:basic_shapes', basicShapesScene),
+    ('scene:writing_text', writingTextScene),
+    ('scene:pbjt', pbjtScene),
+    ('scene:pbjt_delta', pbjtDeltaScene),
+]
+
+MODES = ('immediate', 'buffered')
+
+
+
+def runWorkload(workload, mode, data, repeat = 3):
+    """ Runs a workload on fresh displays and measures it. The wall time is the best of "repeat"
+        runs on a transport that just swallows the data, so it's only the time of the driver. The
+        traffic comes from another run, on an emulated display.
+    """
+    best = None
+    for i in range(repeat):
+        oled = ssd1351.SSD1351(transport = ssd1351.MemoryTransport(record = False), buffered = (mode == 'buffered'))
+        oled.begin()
+
+        start = ssd1351.clock()
+        calls = workload(oled, data)
+        if oled.buffered:
+            oled.display()
+        elapsed = ssd1351.clock() - start
+
+        if best is None or elapsed < best:
+            best = elapsed
+
+    emulator = SSD1351Emulator()
+    oled = ssd1351.SSD1351(transport = emulator, buffered = (mode == 'buffered'))
+    oled.begin()
+    emulator.resetCounters()
+    workload(oled, data)
+    if oled.buffered:
+        oled.display()
+    counters = emulator.getCounters()
+
+    result = {
+        'calls': calls,
+        'seconds': best,
+        'pixels_per_second': counters['pixels'] / best if best > 0 else 0.0,
+    }
+    for name in ('transactions', 'bytes', 'dc_toggles', 'windows', 'pixels'):
+        result[name] = counters[name]
+        result[name + '_per_call'] = float(counters[name]) / calls if calls else 0.0
+    return result
+
+
+def runAll(patterns = None, repeat = 3):
+    """ Runs every workload (or the ones whose name contains any of the patterns) in every mode. """
+    frames = loadFrames()
+    converter = ssd1351.SSD1351(transport = ssd1351.MemoryTransport(record = False))
+    data = {
+        'frames': frames,
+        'frames565': [converter.convertBitmap565(frame) for frame in frames],
+    }
+    data['animation'] = encodeAnimation(data['frames565'])
+
+    results = {}
+    for name, workload in WORKLOADS:
+        if patterns and not any(p in name for p in patterns):
+            continue
+        results[name] = {}
+        for mode in MODES:
+            results[name][mode] = runWorkload(workload, mode, data, repeat)
+    return results
+
+
+def printResults(results):
+    print('{:<22}{:<11}{:>7}{:>11}{:>13}{:>9}{:>10}{:>8}'.format(
+        'workload', 'mode', 'calls', 'ms', 'px/s', 'trans', 'bytes', 'dc'))
+    for name in sorted(results):
+        for mode in MODES:
+            r = results[name][mode]
+            print('{:<22}{:<11}{:>7}{:>11.2f}{:>13.0f}{:>9}{:>10}{:>8}'.format(
+                name, mode, r['calls'], r['seconds'] * 1000, r['pixels_per_second'],
+                r['transactions'], r['bytes'], r['dc_toggles']))
+
+
+def compareResults(old, new):
+    """ Prints the change of every metric between two JSON result files. """
+    print('{:<22}{:<11}{:>14}{:>14}{:>14}{:>14}'.format('workload', 'mode', 'ms', 'trans', 'bytes', 'dc'))
+    for name in sorted(new['results']):
+        if name not in old['results']:
+            continue
+        for mode in MODES:
+            a = old['results'][name][mode]
+            b = new['results'][name][mode]
+            cells = []
+            for key, scale in (('seconds', 1000), ('transactions', 1), ('bytes', 1), ('dc_toggles', 1)):
+                cells.append('{:.0f}->{:.0f}'.format(a[key] * scale, b[key] * scale))
+            print('{:<22}{:<11}{:>14}{:>14}{:>14}{:>14}'.format(name, mode, *cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description = 'Benchmarks the SSD1351 driver against the emulated display.')
+    parser.add_argument('-o', '--output', help = 'JSON file to save the results to')
+    parser.add_argument('-k', dest = 'patterns', action = 'append', help = 'only run the workloads containing this text')
+    parser.add_argument('-r', '--repeat', type = int, default = 3, help = 'runs of each workload, the best time is kept')
+    parser.add_argument('--label', default = '', help = 'name of this run (e.g. a version), saved in the JSON')
+    parser.add_argument('--compare', nargs = 2, metavar = ('OLD', 'NEW'), help = 'compare two JSON result files')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        compareResults(old, new)
+        return
+
+    results = runAll(args.patterns, args.repeat)
+    printResults(results)
+
+    if args.output:
+        report = {
+            'label': args.label,
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'results': results,
+        }
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent = 2, sort_keys = True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# colors.py from https://github.com/saidalvarado/ssd1351
+#
+# Conversions between the usual 24bit (R,G,B) colors and the 16bit
+# RGB565 colors of the screen: 5 bits red, 6 bits green, 5 bits blue.
+#
+# Every function takes a single color or whole ndarrays (an image, or
+# a stack of frames) and converts them at once with Numpy.
+#
+#----------------------------------------------------------------------
+
+
+import numbers
+
+import numpy as np
+
+
+
+
+
+def color565(colorRGB):
+    """ Converts (R,G,B) colors to 16bit colors.
+
+        colorRGB may be a three-tuple, which gives an int, or an ndarray whose last axis holds the
+        (R,G,B) values, which gives an uint16 ndarray with that axis removed.
+    """
+    rgb = np.asarray(colorRGB)
+    c = ((rgb[..., 0].astype(np.uint16) >> 3) << 11) | ((rgb[..., 1].astype(np.uint16) >> 2) << 5) | (rgb[..., 2].astype(np.uint16) >> 3)
+    if c.ndim == 0:
+        return int(c)
+    return c.astype(np.uint16)
+
+
+def color888(color):
+    """ Converts 16bit colors back to (R,G,B) colors. The low bits lost by color565() are filled
+        repeating the high ones, so 0xFFFF is (255, 255, 255) again.
+
+        color may be an int, which gives a three-tuple, or an ndarray, which gives an uint8 ndarray
+        with a new last axis holding the (R,G,B) values.
+    """
+    if isinstance(color, numbers.Integral):
+        return tuple(int(v) for v in color888(np.asarray([color]))[0])
+    c = np.asarray(color, dtype=np.uint16)
+    r = (c >> 11) & 0x1F
+    g = (c >> 5) & 0x3F
+    b = c & 0x1F
+    rgb = np.empty(c.shape + (3,), dtype=np.uint8)
+    rgb[..., 0] = (r << 3) | (r >> 2)
+    rgb[..., 1] = (g << 2) | (g >> 4)
+    rgb[..., 2] = (b << 3) | (b >> 2)
+    return rgb
+
+
+def convertBitmap565(bitmap, background = (0, 0, 0)):
+    """ Converts images to 16bit color, ready for drawBitmap().
+
+        (H,W,3) RGB images, (H,W,4) RGBA images and stacks of them ((N,H,W,3) or (N,H,W,4)) are
+        converted, whatever their dtype. The transparent pixels of RGBA images are blended with the
+        background color. 2-dimensional images are already 16bit, they (and stacks of them) are
+        returned as uint16, without converting them.
+    """
+    bitmap = np.asarray(bitmap)
+    if bitmap.ndim <= 2 or bitmap.shape[-1] not in (3, 4):
+        return bitmap.astype(np.uint16, copy=False)
+
+    if bitmap.shape[-1] == 4:
+        alpha = bitmap[..., 3:4].astype(np.uint32)
+        rgb = (bitmap[..., :3].astype(np.uint32) * alpha + np.asarray(background, dtype=np.uint32) * (255 - alpha)) // 255
+        return color565(rgb)
+    return color565(bitmap)
@@ -0,0 +1,260 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# emulator.py from https://github.com/saidalvarado/ssd1351
+#
+# Software model of the SSD1351 controller, used as a transport.
+#
+# It decodes the command stream the driver sends and keeps its own
+# copy of the display RAM (GRAM), so the result of any drawing can be
+# checked pixel by pixel without a screen attached, and counts the
+# traffic that it took to get there.
+#
+# tests/test_drawing.py uses it to check that the optimized drawing
+# functions put on the screen the same pixels as the original ones.
+#
+# Supported:
+#     CMD_SETCOLUMN, CMD_SETROW, CMD_WRITERAM  (with the auto-increment window)
+#     CMD_SETREMAP  (address increment, column remap and COM scan direction)
+#     CMD_STARTLINE, CMD_DISPLAYOFFSET
+#     CMD_NORMALDISPLAY, CMD_INVERTDISPLAY, CMD_DISPLAYALLON/OFF, CMD_DISPLAYON/OFF
+#     CMD_HORIZSCROLL, CMD_STARTSCROLL, CMD_STOPSCROLL (only recorded)
+# Every other command is parsed (to skip its parameters) and ignored.
+#
+#----------------------------------------------------------------------
+
+
+import numpy as np
+
+from transport import Transport, toBytes
+
+
+
+
+
+class SSD1351Emulator(Transport):
+    """ Transport that behaves like an SSD1351 display.
+
+        gram is the display RAM as a (rows, cols) uint16 ndarray of RGB565 colors, exactly as they
+        were written. image() returns what the panel would show.
+
+        Counters (see getCounters()):
+            transactions  => calls to writeBytes(), one per SPI transfer
+            bytes         => bytes sent
+            dc_toggles    => times the DC pin actually changed
+            commands      => command bytes received
+            windows       => CMD_WRITERAM commands, one per window set up
+            pixels        => pixels written to the GRAM
+            resets        => resets of the display
+    """
+
+    # Commands understood by the emulator
+    CMD_SETCOLUMN          = 0x15
+    CMD_SETROW             = 0x75
+    CMD_WRITERAM           = 0x5C
+    CMD_READRAM            = 0x5D
+    CMD_SETREMAP           = 0xA0
+    CMD_STARTLINE          = 0xA1
+    CMD_DISPLAYOFFSET      = 0xA2
+    CMD_DISPLAYALLOFF      = 0xA4
+    CMD_DISPLAYALLON       = 0xA5
+    CMD_NORMALDISPLAY      = 0xA6
+    CMD_INVERTDISPLAY      = 0xA7
+    CMD_DISPLAYOFF         = 0xAE
+    CMD_DISPLAYON          = 0xAF
+    CMD_HORIZSCROLL        = 0x96
+    CMD_STOPSCROLL         = 0x9E
+    CMD_STARTSCROLL        = 0x9F
+
+    # Number of parameters of every command, the unknown ones have none
+    PARAMETERS = {
+        0x15: 2, 0x75: 2, 0xA0: 1, 0xA1: 1, 0xA2: 1, 0xAB: 1, 0xB1: 1, 0xB2: 3, 0xB3: 1,
+        0xB4: 3, 0xB5: 1, 0xB6: 1, 0xB8: 63, 0xBB: 1, 0xBE: 1, 0xC1: 3, 0xC7: 1, 0xCA: 1,
+        0xFD: 1, 0x96: 5,
+    }
+
+
+    def __init__(self, rows=128, cols=128):
+        self.rows = rows
+        self.cols = cols
+        self.gram = np.zeros((rows, cols), dtype=np.uint16)
+        self.dc = False
+        # Window and write pointer
+        self.col_start, self.col_end = 0, cols - 1
+        self.row_start, self.row_end = 0, rows - 1
+        self.offset = 0                 # pixels written since the last CMD_WRITERAM
+        self.writing = False
+        self.half = None                # first byte of a pixel split between two transfers
+        # Parser
+        self.command = None
+        self.params = []
+        # Display state
+        self.remap = 0x74
+        self.start_line = 0
+        self.display_offset = 0
+        self.mode = self.CMD_NORMALDISPLAY
+        self.on = False
+        self.scroll = None              # (offset, start row, rows, speed) of the last CMD_HORIZSCROLL
+        self.scrolling = False
+        self.resetCounters()
+
+
+    def resetCounters(self):
+        """ Sets every counter back to 0. """
+        self.transactions = 0
+        self.bytes = 0
+        self.dc_toggles = 0
+        self.commands = 0
+        self.windows = 0
+        self.pixels = 0
+        self.resets = 0
+
+    def getCounters(self):
+        """ Returns the counters as a dictionary. """
+        return {
+            'transactions': self.transactions,
+            'bytes': self.bytes,
+            'dc_toggles': self.dc_toggles,
+            'commands': self.commands,
+            'windows': self.windows,
+            'pixels': self.pixels,
+            'resets': self.resets,
+        }
+
+
+    #### Transport ###
+
+    def setDC(self, level):
+        level = bool(level)
+        if level != self.dc:
+            self.dc_toggles += 1
+        self.dc = level
+
+    def reset(self):
+        self.resets += 1
+        self.command = None
+        self.params = []
+        self.writing = False
+        self.half = None
+
+    def writeBytes(self, data):
+        data = toBytes(data)
+        if not isinstance(data, np.ndarray):
+            data = np.frombuffer(bytes(data), dtype=np.uint8)
+        self.transactions += 1
+        self.bytes += len(data)
+
+        if self.writing and self.dc:
+            self.writePixels(data)
+            return
+
+        for byte in data.tolist():
+            if self.command is not None and len(self.params) < self.PARAMETERS.get(self.command, 0):
+                # The parameters usually come as data, some drivers send them as commands
+                self.params.append(byte)
+                if len(self.params) == self.PARAMETERS[self.command]:
+                    self.execute(self.command, self.params)
+            elif self.dc:
+                # Data without a command waiting for it, the controller ignores it
+                continue
+            else:
+                self.commands += 1
+                self.command = byte
+                self.params = []
+                self.writing = False
+                if self.PARAMETERS.get(byte, 0) == 0:
+                    self.execute(byte, [])
+
+
+    #### Controller ###
+
+    def execute(self, command, params):
+        """ *NOT PART OF THE API*
+            Runs a command once all its parameters arrived.
+        """
+        if command == self.CMD_SETCOLUMN:
+            self.col_start, self.col_end = params
+        elif command == self.CMD_SETROW:
+            self.row_start, self.row_end = params
+        elif command == self.CMD_WRITERAM:
+            self.windows += 1
+            self.writing = True
+            self.offset = 0
+            self.half = None
+        elif command == self.CMD_SETREMAP:
+            self.remap = params[0]
+        elif command == self.CMD_STARTLINE:
+            self.start_line = params[0] % self.rows
+        elif command == self.CMD_DISPLAYOFFSET:
+            self.display_offset = params[0] % self.rows
+        elif command in (self.CMD_NORMALDISPLAY, self.CMD_INVERTDISPLAY, self.CMD_DISPLAYALLON, self.CMD_DISPLAYALLOFF):
+            self.mode = command
+        elif command == self.CMD_DISPLAYON:
+            self.on = True
+        elif command == self.CMD_DISPLAYOFF:
+            self.on = False
+        elif command == self.CMD_HORIZSCROLL:
+            self.scroll = tuple(params[:3]) + (params[4],)
+        elif command == self.CMD_STARTSCROLL:
+            self.scrolling = True
+        elif command == self.CMD_STOPSCROLL:
+            self.scrolling = False
+
+
+    def writePixels(self, data):
+        """ *NOT PART OF THE API*
+            Stores pixels in the GRAM following the auto-increment of the window.
+        """
+        if self.half is not None:
+            data = np.concatenate((np.asarray([self.half], dtype=np.uint8), data))
+            self.half = None
+        if len(data) % 2:
+            self.half = int(data[-1])
+            data = data[:-1]
+        if len(data) == 0:
+            return
+
+        pixels = data.view('>u2')
+        w = self.col_end - self.col_start + 1
+        h = self.row_end - self.row_start + 1
+        if w <= 0 or h <= 0:
+            return
+
+        # When the window is full the pointer goes back to its start
+        offsets = (self.offset + np.arange(len(pixels))) % (w * h)
+        if self.remap & 0x01:
+            # Vertical address increment
+            cols = self.col_start + offsets // h
+            rows = self.row_start + offsets % h
+        else:
+            cols = self.col_start + offsets % w
+            rows = self.row_start + offsets // w
+        inside = (rows < self.rows) & (cols < self.cols)
+        self.gram[rows[inside], cols[inside]] = pixels[inside]
+
+        self.offset = (self.offset + len(pixels)) % (w * h)
+        self.pixels += len(pixels)
+
+
+    def image(self):
+        """ Returns what the panel shows, as a (rows, cols) uint16 ndarray of RGB565 colors.
+
+            The rows are taken from the start line on (CMD_STARTLINE and CMD_DISPLAYOFFSET), and
+            flipped as CMD_SETREMAP says. The default remap of the driver (0x74) shows the GRAM
+            as it is.
+        """
+        if not self.on or self.mode == self.CMD_DISPLAYALLOFF:
+            return np.zeros_like(self.gram)
+        if self.mode == self.CMD_DISPLAYALLON:
+            return np.full_like(self.gram, 0xFFFF)
+
+        image = np.roll(self.gram, -(self.start_line + self.display_offset), axis=0)
+        if not self.remap & 0x10:
+            # COM scan from COM0, upside down compared to the default
+            image = image[::-1]
+        if self.remap & 0x02:
+            # Column address 0 mapped to the last segment
+            image = image[:, ::-1]
+        if self.mode == self.CMD_INVERTDISPLAY:
+            image = ~image
+        return np.ascontiguousarray(image)
@@ -1,10 +1,10 @@
 """ Small script that renders a gif of peanut butter jelly time read from 7 .jpg
-    it uses scipy library to read the images. It requires about half a minute before showing the animation
-    due to the slowness of converting each image to 16bit color before displaying
+    it uses scipy library to read the images. Each image is converted to 16bit color before displaying
 """
 
 from scipy import misc
 import ssd1351
+from animation import encodeAnimation, AnimationPlayer
 
 #load frames
 frames = [0,0,0,0,0,0,0]
@@ -18,16 +18,15 @@ oled.begin()
 #Test OLED
 oled.fillCircle(64,64,20,0xf800)
 
-#Transform bitmap to 16bit color format
-frames16b = [oled.convertBitmap565(x) for x in frames]
+#Transform bitmap to 16bit color format, and keep only what changes from one frame to the next
+animation = encodeAnimation([oled.convertBitmap565(x) for x in frames])
+player = AnimationPlayer(oled, animation, 0, 29)
 
 #Start the fun (tittle)
 oled.write("     Peanut Butter \n      Jelly Time!")
 
 
-#Show every frame in order
+#Show every frame in order, forever, at 10 frames per second
 while(1):
 
-    for frame in frames16b:
-        oled.drawBitmap(frame,0,29)
-        # the code is slow enough, so it doesn't requires a delay
+    player.play(fps = 10)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# fonts.py from https://github.com/saidalvarado/ssd1351
+#
+# The fonts the SSD1351 driver writes text with.
+#
+# A Font keeps every glyph side by side in a single strip of pixels
+# (the atlas), packed 8 pixels per byte. Each glyph takes as many
+# columns of the strip as its advance width, so fixed and proportional
+# fonts work the same way, and a whole line of text is cut from the
+# atlas in one go.
+#
+#   loadGlcd()  => Adafruit's glcd format (glcdfont.py), one byte per column
+#   loadBDF()   => X11 Bitmap Distribution Format (.bdf) files
+#
+# defaultFont() is the 5x8 font of glcdfont.py, loaded only once and
+# shared by every display.
+#
+#----------------------------------------------------------------------
+
+
+import io
+import numbers
+
+import numpy as np
+
+# This is the file with the default font
+import glcdfont
+
+
+
+
+
+class Font:
+    """ A bitmap font stored as a packed glyph atlas.
+
+        atlas      => (height, columns/8) uint8 ndarray, the pixels of every glyph one after the other
+        offsets    => first column of each glyph in the atlas
+        advances   => columns of each glyph, the pixels the cursor moves after drawing it
+        height     => height of every glyph, in pixels
+        width      => the biggest advance, the width of a "character cell"
+        charmap    => dictionary from character codes (unicode) to glyph numbers
+        default    => glyph drawn for the characters missing on the charmap (None to skip them)
+    """
+
+    def __init__(self, glyphs, charmap = None, default = None, name = ''):
+        """ glyphs is a list of (height, advance) boolean ndarrays, all with the same height. """
+        self.name = name
+        self.advances = np.asarray([g.shape[1] for g in glyphs], dtype=np.intp)
+        self.offsets = np.cumsum(self.advances) - self.advances
+        self.height = glyphs[0].shape[0]
+        self.width = int(self.advances.max())
+        self.atlas = np.packbits(np.hstack(glyphs).astype(np.uint8), axis=1)
+        if charmap is None:
+            charmap = dict((i, i) for i in range(len(glyphs)))
+        self.charmap = charmap
+        self.default = default
+
+    def __len__(self):
+        return len(self.advances)
+
+    def glyphIndex(self, c):
+        """ Returns the glyph number of a character, None if it can't be drawn. An int is taken as
+            a glyph number.
+        """
+        if isinstance(c, numbers.Integral):
+            if 0 <= c < len(self.advances):
+                return int(c)
+            return None
+        try:
+            code = ord(c)
+        except TypeError:
+            return None
+        return self.charmap.get(code, self.default)
+
+    def render(self, glyphs):
+        """ Returns the pixels of a row of glyphs (glyph numbers) drawn one after the other, as a
+            (height, sum of the advances) boolean ndarray.
+        """
+        glyphs = np.asarray(glyphs, dtype=np.intp).reshape(-1)
+        advances = self.advances[glyphs]
+        starts = np.cumsum(advances) - advances
+        #Column of the atlas for every column of the row
+        columns = np.arange(advances.sum()) + np.repeat(self.offsets[glyphs] - starts, advances)
+        return ((self.atlas[:, columns >> 3] >> (7 - (columns & 7))) & 1).astype(bool)
+
+
+
+
+
+# Adafruit's glcd fonts
+def loadGlcd(font, spacing = 1, charmap = None, default = None, name = 'glcd'):
+    """ Loads a glcd font: a list with one list of bytes per glyph, each byte is a column of the
+        glyph with the bit 0 at the top. "spacing" empty columns are added to every glyph to
+        separate them.
+
+        By default the character codes are the glyph numbers for ASCII (0 to 127), '°' is the
+        little degree circle (247) and the rest of the characters are drawn as '?'.
+    """
+    font = np.asarray(font, dtype=np.uint8)
+    bits = np.unpackbits(font[:, :, np.newaxis], axis=2)[:, :, ::-1]   #bit 0 first
+    masks = np.zeros((font.shape[0], 8, font.shape[1] + spacing), dtype=bool)
+    masks[:, :, :font.shape[1]] = bits.transpose(0, 2, 1)
+
+    if charmap is None:
+        charmap = dict((i, i) for i in range(min(128, len(font))))
+        if len(font) > 247:
+            charmap[0xB0] = 247                  #The little degree circle
+    if default is None and ord('?') < len(font):
+        default = ord('?')
+    return Font(list(masks), charmap, default, name)
+
+
+
+# X11 Bitmap Distribution Format
+def loadBDF(path, spacing = 0):
+    """ Loads a .bdf font file. Every glyph gets the height of the font (FONT_ASCENT plus
+        FONT_DESCENT, or the FONTBOUNDINGBOX) and its DWIDTH (plus "spacing") as advance,
+        with its bitmap placed over the baseline as its BBX says. The characters without an
+        ENCODING are ignored.
+    """
+    glyphs = []
+    properties = {}
+    box = None
+    glyph = None
+    bitmap = None
+
+    #The text of a BDF file is ASCII, but the comments and properties (e.g. COPYRIGHT) are
+    #often Latin-1
+    with io.open(path, encoding = 'latin-1') as f:
+        lines = f.read().splitlines()
+
+    for line in lines:
+        words = line.split()
+        if not words:
+            continue
+        key = words[0]
+        if bitmap is not None:
+            if key == 'ENDCHAR':
+                glyph['bitmap'] = bitmap
+                glyphs.append(glyph)
+                glyph = None
+                bitmap = None
+            else:
+                bitmap.append(key)
+        elif key == 'FONTBOUNDINGBOX':
+            box = [int(v) for v in words[1:5]]
+        elif key in ('FONT_ASCENT', 'FONT_DESCENT', 'DEFAULT_CHAR'):
+            properties[key] = int(words[1])
+        elif key == 'STARTCHAR':
+            glyph = {'encoding': -1, 'dwidth': None, 'bbx': None}
+        elif glyph is not None and key == 'ENCODING':
+            glyph['encoding'] = int(words[1])
+        elif glyph is not None and key == 'DWIDTH':
+            glyph['dwidth'] = int(words[1])
+        elif glyph is not None and key == 'BBX':
+            glyph['bbx'] = [int(v) for v in words[1:5]]
+        elif glyph is not None and key == 'BITMAP':
+            bitmap = []
+
+    if box is None:
+        #Big enough for every glyph that says its size
+        sizes = [g['bbx'] for g in glyphs if g['bbx'] is not None]
+        if not sizes:
+            raise ValueError(str(path) + ' has no FONTBOUNDINGBOX and no glyph with a BBX')
+        box = [max(b[0] for b in sizes), max(b[1] for b in sizes), 0, 0]
+    ascent = properties.get('FONT_ASCENT', box[1] + box[3])
+    descent = properties.get('FONT_DESCENT', -box[3])
+    height = ascent + descent
+
+    masks = []
+    charmap = {}
+    for glyph in glyphs:
+        if glyph['encoding'] < 0:
+            continue
+        w, h, xoff, yoff = glyph['bbx'] if glyph['bbx'] is not None else box
+        advance = (glyph['dwidth'] if glyph['dwidth'] is not None else w) + spacing
+        mask = np.zeros((height, max(advance, 1)), dtype=bool)
+
+        #Each row of the bitmap is an hex number, padded to whole bytes, the first pixel on the MSB
+        pixels = np.zeros((h, w), dtype=bool)
+        for i, row in enumerate(glyph['bitmap'][:h]):
+            bits = int(row, 16)
+            pixels[i] = [(bits >> (4 * len(row) - 1 - j)) & 1 for j in range(w)]
+
+        #Over the baseline, as BBX says, clipped to the cell
+        top = ascent - (yoff + h)
+        y0, y1 = max(top, 0), min(top + h, height)
+        x0, x1 = max(xoff, 0), min(xoff + w, mask.shape[1])
+        if y0 < y1 and x0 < x1:
+            mask[y0:y1, x0:x1] = pixels[y0 - top:y1 - top, x0 - xoff:x1 - xoff]
+
+        charmap[glyph['encoding']] = len(masks)
+        masks.append(mask)
+
+    default = charmap.get(properties.get('DEFAULT_CHAR', -1), charmap.get(ord('?')))
+    return Font(masks, charmap, default, path)
+
+
+
+# The 5x8 font of glcdfont.py, shared by every display
+default_font = None
+
+def defaultFont():
+    """ Returns the 5x8 font of glcdfont.py (6x8 characters, with the separation). It's loaded on
+        the first call, and the same Font is returned afterwards.
+    """
+    global default_font
+    if default_font is None:
+        default_font = loadGlcd(glcdfont.font5x8, name = 'glcdfont')
+    return default_font
@@ -0,0 +1,162 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# pipeline.py from https://github.com/saidalvarado/ssd1351
+#
+# Draw and send on different threads.
+#
+# The application draws on a canvas: an SSD1351 object in buffered mode
+# whose transport goes nowhere, so it has the whole drawing API but
+# only paints its frame_buffer. submit() hands a snapshot of it to a
+# flusher thread, that sends it to the real display while the
+# application keeps going.
+#
+# There is a single slot between both threads: if a new frame is
+# submitted before the previous one was taken, the old one is dropped
+# and its changed regions are merged into the new one. The screen
+# always gets the newest state, never a queue of stale frames.
+#
+# Usage:
+#     pipeline = FramePipeline(oled)
+#     canvas = pipeline.canvas
+#     canvas.fillScreen(canvas.BLACK)
+#     canvas.write("12:45")
+#     pipeline.submit()
+#     ...
+#     pipeline.close()
+#
+#----------------------------------------------------------------------
+
+
+import threading
+
+import ssd1351
+from transport import MemoryTransport
+
+
+
+
+
+class FramePipeline:
+    """ Sends the frames drawn on "canvas" to a display from a flusher thread (see submit()).
+        Only the flusher thread talks to the display until close() is called.
+    """
+
+    def __init__(self, oled):
+        self.oled = oled
+        self.canvas = ssd1351.SSD1351(rows = oled.rows, cols = oled.cols, buffered = True,
+                                      transport = MemoryTransport(record = False))
+        #The canvas starts with what the display has
+        self.canvas.frame_buffer[:] = oled.frame_buffer
+        self.condition = threading.Condition()
+        self.pending = None          #(frame, regions) waiting to be sent
+        self.busy = False            #The flusher is sending a frame
+        self.closing = False
+        self.error = None
+        self.submitted = 0
+        self.flushed = 0
+        self.dropped = 0
+        self.thread = threading.Thread(target = self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+
+    def submit(self):
+        """ Hands what was drawn on the canvas since the last call to the flusher thread, and
+            returns right away. If the previous frame wasn't taken yet it's replaced by this one.
+        """
+        canvas = self.canvas
+        regions = canvas.getDirtyRects()
+        canvas.dirty_rects = []
+        if not regions:
+            return
+        frame = canvas.frame_buffer.copy()
+
+        with self.condition:
+            self.check()
+            if self.pending is not None:
+                #Newest wins, but what changed on the dropped frame must be sent too
+                regions = self.pending[1] + regions
+                self.dropped += 1
+            self.pending = (frame, regions)
+            self.submitted += 1
+            self.condition.notify_all()
+
+
+    def wait(self):
+        """ Blocks until every submitted frame is on the screen. """
+        with self.condition:
+            while (self.pending is not None or self.busy) and self.error is None:
+                self.condition.wait()
+            self.check()
+
+
+    def close(self):
+        """ Sends the last frame and stops the flusher thread. """
+        with self.condition:
+            self.closing = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.check()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+    def stats(self):
+        """ Returns the counters of the pipeline as a dictionary.
+
+            submitted  => frames submitted
+            flushed    => frames sent to the display
+            dropped    => frames replaced by a newer one before being sent
+        """
+        with self.condition:
+            return {
+                'submitted': self.submitted,
+                'flushed': self.flushed,
+                'dropped': self.dropped,
+            }
+
+
+    def check(self):
+        """ *NOT PART OF THE API*
+            Raises, on the application's thread, the error that stopped the flusher thread.
+        """
+        if self.error is not None:
+            raise self.error
+
+
+    def run(self):
+        """ *NOT PART OF THE API*
+            Flusher thread: sends the pending frame, one after the other.
+        """
+        oled = self.oled
+        while True:
+            with self.condition:
+                while self.pending is None and not self.closing:
+                    self.condition.wait()
+                if self.pending is None:
+                    return
+                frame, regions = self.pending
+                self.pending = None
+                self.busy = True
+
+            try:
+                for x, y, w, h in regions:
+                    oled.frame_buffer[y:y+h ,x:x+w] = frame[y:y+h ,x:x+w]
+                    oled.markDirty(x, y, w, h)
+                oled.display()
+            except Exception as e:
+                with self.condition:
+                    self.error = e
+                    self.busy = False
+                    self.condition.notify_all()
+                return
+
+            with self.condition:
+                self.busy = False
+                self.flushed += 1
+                self.condition.notify_all()
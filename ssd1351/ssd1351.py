@@ -16,11 +16,12 @@
 #
 # Some important things to know about this device and SPI:
 #
-# SPI and GPIO calls are made through an abstraction library that calls
-# the appropriate library for the platform.
+# SPI and GPIO calls are made through a transport (see transport.py)
+# that calls the appropriate library for the platform.
 # For the RaspberryPi:
 #     wiring2
 #     spidev
+# A MemoryTransport lets the driver run without any hardware attached.
 #
 # It requires  Numpy (version >= 1.92) to speed up some of the image processing
 #
@@ -29,35 +30,203 @@
 
 import numpy as np
 import time
-# Imports for GPIO manipulation
-import spidev
-import wiringpi2
-# This is the file with the text font
-import glcdfont
+import numbers
+import contextlib
+from collections import OrderedDict
+# SPI and GPIO manipulation
+from transport import GPIO, Transport, SpidevTransport, MemoryTransport, wireBytes, joinBytes
+# Conversions between 24bit and 16bit colors
+import colors
+# The fonts for the text
+from fonts import Font, loadGlcd, loadBDF, defaultFont
 
 
+# The most precise clock available, for the instrumentation counters
+clock = getattr(time, 'perf_counter', time.time)
 
 
 
-# Class definition intended for GPIO manipulation.
-class GPIO:
-    def __init__(self):
-        self.gpio = wiringpi2.GPIO(wiringpi2.GPIO.WPI_MODE_PINS)
-        self.setup = self.wiringpi2_setup
-        self.output = self.gpio.digitalWrite
-        self.input = self.gpio.digitalRead
-        self.OUT = self.gpio.OUTPUT
-        self.IN = self.gpio.INPUT
-        self.HIGH = self.gpio.HIGH
-        self.LOW = self.gpio.LOW
-        self.PUD_UP = self.gpio.PUD_UP
-        self.PUD_DOWN = self.gpio.PUD_DOWN
-        self.PUD_OFF = self.gpio.PUD_OFF
 
-    def wiringpi2_setup(self, channel, direction, pull_up_down=None):
-        self.gpio.pinMode(channel, direction)
-        if pull_up_down is None: pull_up_down = self.gpio.PUD_OFF
-        self.gpio.pullUpDnControl(channel, pull_up_down)
+
+# Small least-recently-used cache, for the pre-serialized data
+class LRUCache:
+    def __init__(self, size):
+        self.size = size
+        self.data = OrderedDict()
+
+    def get(self, key):
+        value = self.data.pop(key, None)
+        if value is not None:
+            self.data[key] = value
+        return value
+
+    def put(self, key, value):
+        self.data.pop(key, None)
+        self.data[key] = value
+        if len(self.data) > self.size:
+            self.data.popitem(last=False)
+
+    def clear(self):
+        self.data.clear()
+
+
+
+# Midpoint circle tables, shared by every display and kept for the latest radii
+circle_tables = LRUCache(64)
+
+def circleTable(r):
+    """ Returns the steps of the midpoint circle algorithm for a radius, as two ndarrays (xs, ys)
+        with the point of the first octant after each step (x grows from 1, y falls from r).
+        Every other octant is a reflection of it. They are computed once per radius.
+    """
+    table = circle_tables.get(r)
+    if table is None:
+        xs = []
+        ys = []
+        f     = 1 - r
+        ddF_x = 1
+        ddF_y = -2 * r
+        x     = 0
+        y     = r
+        while (x<y):
+            if (f >= 0):
+                y     -= 1
+                ddF_y += 2
+                f     += ddF_y
+            x     += 1
+            ddF_x += 2
+            f     += ddF_x
+            xs.append(x)
+            ys.append(y)
+        table = (np.asarray(xs, dtype=np.intp), np.asarray(ys, dtype=np.intp))
+        circle_tables.put(r, table)
+    return table
+
+
+
+# Transfer planning for the frame_buffer flushes
+def planWindows(changed, window_cost, pixel_cost):
+    """ Decides which windows to send to cover every changed pixel of a region at the lowest cost
+        (cost = window_cost + pixel_cost * pixels, for every window).
+
+        Each changed row is reduced to the span between its first and last changed pixel, and
+        consecutive spans are merged into a single larger window while that is cheaper than
+        sending them apart. When the rows have several spans far apart (e.g. the sides of an
+        outline) they are also planned as columns of windows, one per span, and the cheaper of
+        both plans is kept.
+
+
+    Parameters
+    ----------
+    changed : 2-dimensional boolean ndarray.
+        Mask of the pixels that must be sent, indexed [y, x].
+
+    window_cost : float.
+        Cost of setting up a window.
+
+    pixel_cost : float.
+        Cost of sending one pixel.
+
+    Returns
+    --------
+    out : list of four-tuples.
+        (x, y, w, h) windows, relative to the mask.
+
+    """
+    rows = np.flatnonzero(changed.any(axis=1))
+    if len(rows) == 0:
+        return []
+    mask = changed[rows]
+
+    #First and last changed pixel of every changed row
+    lo = mask.argmax(axis=1)
+    hi = mask.shape[1] - 1 - mask[:, ::-1].argmax(axis=1)
+    windows = mergeSpans(rows, lo, hi, window_cost, pixel_cost)
+
+    #The spans of every row. A gap is only worth a window of its own if the rows below it
+    #keep it for about as long as it is wide, so the narrower ones don't split a span.
+    gap = max(1, int(np.sqrt(window_cost / pixel_cost)))
+    if (hi - lo + 1 - mask.sum(axis=1)).max() < gap:
+        return windows
+    width = mask.shape[1]
+    columns = np.arange(width)
+    before = np.maximum.accumulate(np.where(mask, columns, -2 * width - gap), axis=1)
+    before = np.hstack((np.full((len(rows), 1), -2 * width - gap), before[:, :-1]))
+    after = np.minimum.accumulate(np.where(mask, columns, 3 * width + gap)[:, ::-1], axis=1)[:, ::-1]
+    after = np.hstack((after[:, 1:], np.full((len(rows), 1), 3 * width + gap)))
+    starts = mask & (columns - before > gap)
+    ends = mask & (after - columns > gap)
+    counts = starts.sum(axis=1)
+    if counts.max() == 1:
+        return windows
+
+    #Rows one after the other with the same number of spans are planned together
+    spans_lo = np.flatnonzero(starts) % width
+    spans_hi = np.flatnonzero(ends) % width
+    offsets = np.cumsum(counts) - counts
+    breaks = np.flatnonzero((np.diff(rows) != 1) | (np.diff(counts) != 0)) + 1
+    tracks = []
+    for i, j in zip([0] + breaks.tolist(), breaks.tolist() + [len(rows)]):
+        n = int(counts[i])
+        plan = mergeSpans(rows[i:j], lo[i:j], hi[i:j], window_cost, pixel_cost)
+        if n > 1:
+            k = slice(offsets[i], offsets[i] + n * (j - i))
+            split = planTracks(rows[i:j], spans_lo[k].reshape(j - i, n), spans_hi[k].reshape(j - i, n), window_cost, pixel_cost)
+            if planCost(split, window_cost, pixel_cost) < planCost(plan, window_cost, pixel_cost):
+                plan = split
+        tracks.extend(plan)
+
+    if planCost(tracks, window_cost, pixel_cost) < planCost(windows, window_cost, pixel_cost):
+        return tracks
+    return windows
+
+
+def mergeSpans(rows, lo, hi, window_cost, pixel_cost):
+    """ *NOT PART OF THE API*
+        Merges the spans [lo, hi] of the rows, from top to bottom, into windows while that is
+        cheaper than sending them apart. Returns the (x, y, w, h) windows.
+    """
+    windows = []
+    y0, y1, x0, x1 = rows[0], rows[0], lo[0], hi[0]
+    for y, a, b in zip(rows[1:].tolist(), lo[1:].tolist(), hi[1:].tolist()):
+        apart = window_cost + pixel_cost * (b - a + 1)
+        current = pixel_cost * (x1 - x0 + 1) * (y1 - y0 + 1)
+        merged = pixel_cost * (max(x1, b) - min(x0, a) + 1) * (y - y0 + 1)
+        if merged <= current + apart:
+            y1, x0, x1 = y, min(x0, a), max(x1, b)
+        else:
+            windows.append((int(x0), int(y0), int(x1 - x0 + 1), int(y1 - y0 + 1)))
+            y0, y1, x0, x1 = y, y, a, b
+    windows.append((int(x0), int(y0), int(x1 - x0 + 1), int(y1 - y0 + 1)))
+    return windows
+
+
+def planTracks(rows, lo, hi, window_cost, pixel_cost):
+    """ *NOT PART OF THE API*
+        Plans consecutive rows that have the same number of spans, lo and hi are (rows, spans)
+        arrays. Each column of spans becomes a window, unless splitting the rows in two halves
+        (and so on) is cheaper. Returns the (x, y, w, h) windows.
+    """
+    x0 = lo.min(axis=0)
+    x1 = hi.max(axis=0)
+    h = int(rows[-1] - rows[0] + 1)
+    windows = [(int(a), int(rows[0]), int(b - a + 1), h) for a, b in zip(x0, x1)]
+    cost = planCost(windows, window_cost, pixel_cost)
+    #Splitting can't go below twice the windows and the spans alone
+    least = 2 * len(windows) * window_cost + pixel_cost * int((hi - lo + 1).sum())
+    if len(rows) > 1 and cost > least:
+        m = len(rows) // 2
+        split = planTracks(rows[:m], lo[:m], hi[:m], window_cost, pixel_cost) + planTracks(rows[m:], lo[m:], hi[m:], window_cost, pixel_cost)
+        if planCost(split, window_cost, pixel_cost) < cost:
+            return split
+    return windows
+
+
+def planCost(windows, window_cost, pixel_cost):
+    """ *NOT PART OF THE API*
+        Cost of sending a list of (x, y, w, h) windows.
+    """
+    return sum(window_cost + pixel_cost * w * h for x, y, w, h in windows)
 
 
 
@@ -118,6 +287,10 @@ class SSD1351:
     SSD1351WIDTH           = 128
     SSD1351HEIGHT           = 128
 
+    # Transfer cost model (seconds), used to decide how to send the changes of the frame_buffer
+    WINDOW_COST            = 1.0/2501      # Setting up a window, 2501 pixels/sec is the speed of drawPixel
+    PIXEL_COST             = 1.0/597956    # Each pixel of a window, 597956 pixels/sec is the speed of fillRect
+
 
 
 
@@ -126,63 +299,259 @@ class SSD1351:
     # dc_pin is the data/commmand pin.  This line is HIGH for data, LOW for command.
     # We will keep d/c low and bump it high only for commands with data
     # reset is normally HIGH, and pulled LOW to reset the display
+    # buffered selects the retained mode: drawing only touches the frame_buffer
+    # and nothing is sent to the screen until display() is called
+    # transport replaces the SPI port and pins (e.g. MemoryTransport() to run without hardware),
+    # when it's given bus, device, dc_pin and reset_pin are ignored
 
-    def __init__(self, bus=0, device=0, dc_pin=3, reset_pin=2, rows=128, cols=128, spiBufferSize = 4096):
+    def __init__(self, bus=0, device=0, dc_pin=3, reset_pin=2, rows=128, cols=128, spiBufferSize = 4096, buffered = False, transport = None):
         # Display size
         self.cols = cols
         self.rows = rows
         # Pins assigment
         self.dc_pin = dc_pin
         self.reset_pin = reset_pin
-        # SPI port configuration
-        self.spi = spidev.SpiDev()
-        self.spi.open(bus, device)
-        self.spi.max_speed_hz = 16000000 #We set the bus to 16Mhz
-        self.spi.mode = 3 # necessary!
         self.spi_buffer_size = spiBufferSize
-        # GPIO port configuration. (The defition is at the start of the code)
-        self.gpio = GPIO()
-        self.gpio.setup(self.reset_pin, self.gpio.OUT)
-        self.gpio.output(self.reset_pin, self.gpio.HIGH)
-        self.gpio.setup(self.dc_pin, self.gpio.OUT)
-        self.gpio.output(self.dc_pin, self.gpio.LOW)
-        # Load de font
-        self.font = np.asarray(glcdfont.font5x8,dtype = np.uint8)    #We make a copy
-        self.font_size_x = glcdfont.x_size
-        self.font_size_y = glcdfont.y_size
+        # SPI port and GPIO configuration
+        if transport is None:
+            transport = SpidevTransport(bus, device, dc_pin, reset_pin, spiBufferSize = spiBufferSize)
+        self.transport = transport
+        #Transfers waiting to be sent, all of them with the same DC level (see startWrite())
+        self.dc = False
+        self.queue = []
+        self.queue_dc = False
+        self.queue_size = 0
+        self.queue_limit = 2 * rows * cols
+        self.write_depth = 0
+        #Pre-serialized chunks of a solid color, ready to be sent by fillRect
+        self.fill_chunks = LRUCache(16)
+        # Load de font, the default one is shared by every display (see fonts.py)
+        self.setFont(defaultFont())
+        #The latest (glyph, color, background, size) ready to be sent
+        self.glyph_cache = LRUCache(256)
+        #Writing cursor, in pixels
         self.cursor_x = 0
         self.cursor_y = 0
+        self.text_size = 1
         #Frame buffer for speed optimization
         self.frame_buffer = np.full((rows,cols),0,dtype=np.uint16)
+        #What the screen's RAM is currently holding, the display() diffs against it
+        self.gram_buffer = np.full((rows,cols),0,dtype=np.uint16)
         #Toogle switch for speed optimization
         self.optimization = False #Becomes True in the begin() function
+        #Retained mode, all the drawing goes to the frame_buffer until display() is called
+        self.buffered = buffered
+        #Regions of the frame_buffer painted since the last display(), as (x, y, w, h) tuples
+        self.dirty_rects = []
+        self.max_dirty_rects = 8
+        #How display() sends the dirty rectangles: 'diff' only sends what changed against the
+        #gram_buffer, as planned by the transfer cost model. 'dirty' sends them as they are.
+        self.flush_strategy = 'diff'
+        self.window_cost = self.WINDOW_COST
+        self.pixel_cost = self.PIXEL_COST
+        #Band of rows (y, h) being scrolled by the screen itself, None when it's still
+        self.scrolling = None
+        #Terminal mode, the text scrolls up moving the start line of the screen (see setTerminal())
+        self.terminal = False
+        self.start_line = 0
+        #Instrumentation counters, see stats()
+        self.resetStats()
 
 
     # Reset display
     def reset(self):
-        self.gpio.output(self.reset_pin, self.gpio.LOW)
-        time.sleep(0.010) # 10ms
-        self.gpio.output(self.reset_pin, self.gpio.HIGH)
+        self.sendQueue()
+        self.transport.reset()
 
     # Use the SPI bus to send a command to the display
     def writeCommand(self, command):
 
-        #By default, the DC pin is always LOW
-        self.spi.writebytes([command])
+        counters = self.counters
+        counters['commands'] += 1
+        counters['bytes'] += 1
+        if command == self.CMD_WRITERAM:
+            counters['windows'] += 1
+
+        #Commands go with the DC pin LOW
+        self.queueBytes(False, [command], 1)
 
 
     # Use the SPI bus to send data to the display (following a command)
+    # It takes an int, a list of ints, any bytes-like object or a 16bit color ndarray
     def writeData(self, command):
 
-        if type(command) != list:
+        if isinstance(command, numbers.Integral):
             command = [command]
 
-        # DC pin  <-- HIGH
-        self.gpio.output(self.dc_pin, self.gpio.HIGH)
-        # write data
-        self.spi.writebytes(command)
-        # DC pin  <-- LOW
-        self.gpio.output(self.dc_pin, self.gpio.LOW)
+        if isinstance(command, np.ndarray) and command.dtype != np.uint8:
+            size = 2 * command.size
+        else:
+            size = len(command)
+
+        counters = self.counters
+        counters['data_writes'] += 1
+        counters['bytes'] += size
+
+        #Data goes with the DC pin HIGH
+        self.queueBytes(True, command, size)
+
+
+    def startWrite(self):
+        """ Starts a group of transfers. Until the matching endWrite() the commands and data are
+            queued, consecutive pieces of data (or consecutive commands) are merged and sent in a
+            single SPI call, and the DC pin only moves when it has to. The groups can be nested.
+            writing() does the same for a block of code, and cleans up if it fails.
+
+
+        Parameters
+        ----------
+        Nothing
+
+        Returns
+        --------
+        Nothing
+
+        """
+        self.write_depth += 1
+
+
+    def endWrite(self):
+        """ Ends a group of transfers started with startWrite(), sending whatever is still queued
+            once the outermost group ends.
+
+
+        Parameters
+        ----------
+        Nothing
+
+        Returns
+        --------
+        Nothing
+
+        """
+        self.write_depth -= 1
+        if self.write_depth <= 0:
+            self.write_depth = 0
+            self.sendQueue()
+
+
+    def abortWrite(self):
+        """ Drops whatever is queued and closes every group of transfers, e.g. after the transport
+            failed in the middle of one. The next transfers are sent right away again. The screen
+            may have missed part of what was drawn, display(True) sends everything again.
+
+
+        Parameters
+        ----------
+        Nothing
+
+        Returns
+        --------
+        Nothing
+
+        """
+        self.write_depth = 0
+        self.queue = []
+        self.queue_size = 0
+
+
+    @contextlib.contextmanager
+    def writing(self):
+        """ startWrite() and endWrite() around a block of code:
+
+                with oled.writing():
+                    oled.setAddrWindow(x, y, w, h)
+                    oled.writeData(pixels)
+
+            If anything inside raises, the queued transfers are dropped (see abortWrite()) instead of
+            leaving the display stuck queueing everything.
+        """
+        self.startWrite()
+        try:
+            yield
+        except BaseException:
+            self.abortWrite()
+            raise
+        self.endWrite()
+
+
+    def queueBytes(self, dc, data, size):
+        """ *NOT PART OF THE API*
+            Adds a transfer to the queue. A change of the DC level sends what was queued before.
+            Outside of startWrite()/endWrite() it's sent right away.
+        """
+        if self.queue and self.queue_dc != dc:
+            self.sendQueue()
+        self.queue_dc = dc
+        self.queue.append(data)
+        self.queue_size += size
+        if self.write_depth == 0 or self.queue_size >= self.queue_limit:
+            self.sendQueue()
+
+
+    def sendQueue(self):
+        """ *NOT PART OF THE API*
+            Sends the queued transfers in a single SPI call, moving the DC pin only if needed.
+        """
+        if not self.queue:
+            return
+        if len(self.queue) == 1:
+            data = self.queue[0]
+        else:
+            data = joinBytes(self.queue)
+        #Taken from the queue before sending, so a failed transfer isn't sent again with the next
+        self.queue = []
+        self.queue_size = 0
+
+        counters = self.counters
+        start = clock()
+        if self.dc != self.queue_dc:
+            self.transport.setDC(self.queue_dc)
+            self.dc = self.queue_dc
+            counters['dc_toggles'] += 1
+        self.transport.writeBytes(data)
+        counters['spi_seconds'] += clock() - start
+        counters['transactions'] += 1
+
+
+    def stats(self):
+        """ Returns a snapshot of the instrumentation counters of the driver, kept since it was
+            created or since the last resetStats().
+
+
+        Parameters
+        ----------
+        Nothing
+
+
+        Returns
+        --------
+        out : dictionary.
+            commands        => calls to writeCommand()
+            data_writes     => calls to writeData()
+            bytes           => bytes sent to the screen (commands and data)
+            transactions    => SPI calls actually made, after merging the queued transfers
+            dc_toggles      => times the DC pin was moved
+            windows         => windows of the screen's RAM set up for writing
+            pixels_skipped  => drawPixel() calls skipped because the frame_buffer already had the color
+            spi_seconds     => time spent inside the SPI and GPIO calls, in seconds
+
+        """
+        return dict(self.counters)
+
+
+    def resetStats(self):
+        """ Sets all the instrumentation counters (see stats()) back to 0. """
+        self.counters = {
+            'commands': 0,
+            'data_writes': 0,
+            'bytes': 0,
+            'transactions': 0,
+            'dc_toggles': 0,
+            'windows': 0,
+            'pixels_skipped': 0,
+            'spi_seconds': 0.0,
+        }
 
 
 
@@ -191,72 +560,77 @@ class SSD1351:
         time.sleep(0.001) # 1ms
         self.reset()
 
-        self.writeCommand(self.CMD_COMMANDLOCK)   # set command lock
-        self.writeData(0x12)
+        #The consecutive commands go together
+        with self.writing():
+            self.writeCommand(self.CMD_COMMANDLOCK)   # set command lock
+            self.writeData(0x12)
 
-        self.writeCommand(self.CMD_COMMANDLOCK)   # set command lock
-        self.writeData(0xB1)
+            self.writeCommand(self.CMD_COMMANDLOCK)   # set command lock
+            self.writeData(0xB1)
 
-        self.writeCommand(self.CMD_DISPLAYOFF)        # 0xAE
+            self.writeCommand(self.CMD_DISPLAYOFF)        # 0xAE
 
-        self.writeCommand(self.CMD_CLOCKDIV)          # 0xB3
-        self.writeCommand(0xF1)                          # 7:4 = Oscillator Frequency, 3:0 = CLK Div Ratio (A[3:0]+1 = 1..16)
+            self.writeCommand(self.CMD_CLOCKDIV)          # 0xB3
+            self.writeCommand(0xF1)                          # 7:4 = Oscillator Frequency, 3:0 = CLK Div Ratio (A[3:0]+1 = 1..16)
 
-        self.writeCommand(self.CMD_MUXRATIO)
-        self.writeData(127)
+            self.writeCommand(self.CMD_MUXRATIO)
+            self.writeData(127)
 
-        self.writeCommand(self.CMD_SETREMAP)
-        self.writeData(0x74)
+            self.writeCommand(self.CMD_SETREMAP)
+            self.writeData(0x74)
 
-        self.writeCommand(self.CMD_SETCOLUMN)
-        self.writeData(0x00)
-        self.writeData(0x7F)
+            self.writeCommand(self.CMD_SETCOLUMN)
+            self.writeData(0x00)
+            self.writeData(0x7F)
 
-        self.writeCommand(self.CMD_SETROW)
-        self.writeData(0x00)
-        self.writeData(0x7F)
+            self.writeCommand(self.CMD_SETROW)
+            self.writeData(0x00)
+            self.writeData(0x7F)
 
-        self.writeCommand(self.CMD_STARTLINE)         # 0xA1
-        self.writeData(0)
+            self.writeCommand(self.CMD_STARTLINE)         # 0xA1
+            self.writeData(0)
+            self.start_line = 0
 
-        self.writeCommand(self.CMD_DISPLAYOFFSET)     # 0xA2
-        self.writeData(0x0)
+            self.writeCommand(self.CMD_DISPLAYOFFSET)     # 0xA2
+            self.writeData(0x0)
 
-        self.writeCommand(self.CMD_SETGPIO)
-        self.writeData(0x00)
+            self.writeCommand(self.CMD_SETGPIO)
+            self.writeData(0x00)
 
-        self.writeCommand(self.CMD_FUNCTIONSELECT)
-        self.writeData(0x01)  # internal (diode drop)
+            self.writeCommand(self.CMD_FUNCTIONSELECT)
+            self.writeData(0x01)  # internal (diode drop)
 
-        self.writeCommand(self.CMD_PRECHARGE)        # 0xB1
-        self.writeCommand(0x32)
+            self.writeCommand(self.CMD_PRECHARGE)        # 0xB1
+            self.writeCommand(0x32)
 
-        self.writeCommand(self.CMD_VCOMH)             #0xBE
-        self.writeCommand(0x05)
+            self.writeCommand(self.CMD_VCOMH)             #0xBE
+            self.writeCommand(0x05)
 
-        self.writeCommand(self.CMD_NORMALDISPLAY)     # 0xA6
+            self.writeCommand(self.CMD_NORMALDISPLAY)     # 0xA6
 
-        self.writeCommand(self.CMD_CONTRASTABC)
-        self.writeData(0xC8)
-        self.writeData(0x80)
-        self.writeData(0xC8)
+            self.writeCommand(self.CMD_CONTRASTABC)
+            self.writeData(0xC8)
+            self.writeData(0x80)
+            self.writeData(0xC8)
 
-        self.writeCommand(self.CMD_CONTRASTMASTER)
-        self.writeData(0x0F)
+            self.writeCommand(self.CMD_CONTRASTMASTER)
+            self.writeData(0x0F)
 
-        self.writeCommand(self.CMD_SETVSL )
-        self.writeData(0xA0)
-        self.writeData(0xB5)
-        self.writeData(0x55)
+            self.writeCommand(self.CMD_SETVSL )
+            self.writeData(0xA0)
+            self.writeData(0xB5)
+            self.writeData(0x55)
 
-        self.writeCommand(self.CMD_PRECHARGE2)
-        self.writeData(0x01)
+            self.writeCommand(self.CMD_PRECHARGE2)
+            self.writeData(0x01)
 
-        self.writeCommand(self.CMD_DISPLAYON)         #--turn on oled panel
+            self.writeCommand(self.CMD_DISPLAYON)         #--turn on oled panel
 
         #Now we take the chance to clean the screen
         self.fillScreen(0)
-        self.frame_buffer = np.full((128,128),0,dtype=np.uint16)
+        if self.buffered: self.display(True)
+        self.frame_buffer = np.full((self.rows,self.cols),0,dtype=np.uint16)
+        self.gram_buffer = np.full((self.rows,self.cols),0,dtype=np.uint16)
         self.optimization = True
 
     #Invert the display... whatever that means.
@@ -283,6 +657,73 @@ class SSD1351:
             self.writeCommand(self.CMD_NORMALDISPLAY)
 
 
+    def startScroll(self, y = 0, h = 128, step = 1, speed = 1):
+        """ Makes the screen scroll a band of rows horizontally by itself, round and round, until
+            stopScroll() is called. Nothing is sent while it scrolls, so a ticker costs no SPI
+            traffic at all. The band should not be drawn on while it scrolls.
+
+
+        Parameters
+        ----------
+        y : uint8.
+            First row of the band, in pixels.
+            default => 0
+
+        h : uint8.
+            Rows of the band, in pixels.
+            default => 128
+
+        step : int.
+            Columns moved on each step, from -63 to 63. Positive values scroll to the right,
+            negative values to the left.
+            default => 1
+
+        speed : uint8.
+            Time between the steps: 0 => fastest, 1 => normal, 2 => slow, 3 => slowest.
+            default => 1
+
+        Returns
+        --------
+        Nothing
+
+        """
+        y = max(0, min(int(y), self.SSD1351HEIGHT - 1))
+        h = max(1, min(int(h), self.SSD1351HEIGHT - y))
+        step = max(-63, min(int(step), 63))
+
+        with self.writing():
+            if self.scrolling is not None:
+                self.stopScroll()
+            self.writeCommand(self.CMD_HORIZSCROLL)
+            #Columns per step (64 to 255 go to the left), start row, rows, reserved and speed
+            self.writeData([step & 0xFF, y, h, 0x00, speed & 0x03])
+            self.writeCommand(self.CMD_STARTSCROLL)
+        self.scrolling = (y, h)
+
+
+    def stopScroll(self):
+        """ Stops the scrolling started with startScroll(). The scrolled band is sent again from
+            the frame_buffer, so the screen shows what the frame_buffer has.
+
+
+        Parameters
+        ----------
+        Nothing
+
+        Returns
+        --------
+        Nothing
+
+        """
+        with self.writing():
+            self.writeCommand(self.CMD_STOPSCROLL)
+            if self.scrolling is not None:
+                #The screen's RAM has to be written again after a scroll
+                y, h = self.scrolling
+                self.sendWindow(0, y, self.SSD1351WIDTH, h)
+        self.scrolling = None
+
+
     # def flipDisplay(self, flipped=True):
     #     # self.flipped = flipped
     #     if flipped:
@@ -333,30 +774,46 @@ class SSD1351:
 
 
 
-    def color565(self, (colorRGB)): # ints
+    def color565(self, colorRGB): # ints
         """ Converts a three-tuple representing an (RGB) color to a 16bit unsigned int representing
-            such color
+            such color. Whole arrays of colors are converted at once.
 
 
         Parameters
         ----------
-        coloresRGB: three-tuple.
+        coloresRGB: three-tuple, ndarray.
                     Tuple of colors (R,G,B) to be converted to a 16bits uint representation
                     5 bits red, 6 bits greenn y 5 bits blue.
+                    May also be an ndarray with the (R,G,B) values on its last axis.
 
         Returns
         --------
         c : uint16
             RGB color represented as an uint16, ready for the drawing functions.
+            (an uint16 ndarray without the last axis, for an ndarray)
 
         """
-        r,g,b = colorRGB
-        c = r >> 3
-        c <<= 6
-        c |= g >> 2
-        c <<= 5
-        c |= b >> 3
-        return c
+        return colors.color565(colorRGB)
+
+
+    def color888(self, color):
+        """ Converts a 16bit color back to an (RGB) three-tuple, the inverse of color565().
+            Whole arrays of colors are converted at once.
+
+
+        Parameters
+        ----------
+        color : uint16, ndarray.
+                16bit color (e.g. 0xF800), or an ndarray of them.
+
+        Returns
+        --------
+        out : three-tuple
+            (R,G,B) color, with values from 0 to 255.
+            (an uint8 ndarray with the (R,G,B) values on a new last axis, for an ndarray)
+
+        """
+        return colors.color888(color)
 
 
     def fillScreen(self, fillcolor): # int
@@ -406,66 +863,45 @@ class SSD1351:
 
         """
 
+        #Retained mode, only the frame_buffer gets painted
+        if self.buffered:
+            self.fillRectFB(x, y, w, h, fillcolor)
+            return
 
         # Bounds check
-        if x >= self.SSD1351WIDTH or y >= self.SSD1351HEIGHT:
+        rect = self.clipRect(x, y, w, h)
+        if rect is None:
             return
-
-        if y+h > self.SSD1351HEIGHT:
-            h = self.SSD1351HEIGHT - y - 1
-
-        if x+w > self.SSD1351WIDTH:
-            w = self.SSD1351WIDTH - x - 1
-
-        #Check if optimization is actually convinient
-        # if self.optimization:
-        #     total_pixels = float(w*h)
-        #     time_normal = total_pixels/597956      #597956 pixels/sec  is the Normal speed of the fillRect function
-        #     painted_pixels = [tt for tt in np.asarray(np.unique(self.frame_buffer[x:x+w ,y:y+h],return_counts=True)).T  if fillcolor in tt]
-        #     if painted_pixels == []: painted_pixels = 0 #Border case where there are no painted pixels
-        #     else: painted_pixels = painted_pixels[0][1]
-        #     pixels_to_paint = total_pixels - painted_pixels
-        #     time_pixelated = float(pixels_to_paint)/2501 #874 pixels/sec  is the Normal speed of the drawPixel function
-        #     print "fillRect = {}ms,  drawPixel = {}ms for {}pixels totals and {}pixels real".format(time_normal*1000,time_pixelated*1000,total_pixels,pixels_to_paint)
-        #     if time_pixelated < time_normal:
-        #         print "pixelado!"
-        #         [self.drawPixel(x1,y1,fillcolor) for x1 in range(x,x+w) for y1 in range(y,y+h)]
-
-        #         #Escribimos en el frame_buffer
-        #         block = np.full((w,h),fillcolor)
-        #         self.frame_buffer[x:x+w ,y:y+h] = block
-        #         return
-
+        x, y, w, h = rect
 
         # set location
-        self.writeCommand(self.CMD_SETCOLUMN)
-        self.writeData([x,x+w-1])
-        # self.writeData(x+w-1)
-        self.writeCommand(self.CMD_SETROW)
-        self.writeData([y,y+h-1])
-        # self.writeData(y+h-1)
-        # fill!
-        self.writeCommand(self.CMD_WRITERAM)
-
-        #We try to get around the limitation of the 4096 buffer size of the spidev module
-        if 2*w*h > self.spi_buffer_size:
-        #With this we split the transfer into a lot of 4096 bytes transfers
-            for i in xrange(2*w*h/self.spi_buffer_size):
-                self.writeData([fillcolor >> 8,fillcolor] * (self.spi_buffer_size/2))
-            #     print"Enviadas 4096 trasnferencias"
-            # print"Enviando ultimas {} transferencias".format((((2*w*h)%4096)/2))
-            if ((2*w*h)%self.spi_buffer_size) > 0:
+        with self.writing():
+            self.setAddrWindow(x, y, w, h)
+
+            # fill! The same pre-serialized chunk is queued again and again, and sent at once
+            chunk = self.fillChunk(fillcolor)
+            total = 2*w*h
+            for i in range(total // len(chunk)):
+                self.writeData(chunk)
+            if total % len(chunk) > 0:
                 #If there is still something to send, send it!
-                self.writeData([fillcolor >> 8,fillcolor] * (((2*w*h)%self.spi_buffer_size)/2))
-        else:
-            self.writeData([fillcolor >> 8,fillcolor] * w*h)
-        # for i in xrange(w*h):                                ##### Quizas se puede mejorar con un map
-        #    self.writeData(fillcolor >> 8)
-        #    self.writeData(fillcolor)
+                self.writeData(chunk[:total % len(chunk)])
 
         #Escribimos en el frame_buffer
-        block = np.full((w,h),fillcolor)
-        self.frame_buffer[x:x+w ,y:y+h] = block
+        self.frame_buffer[y:y+h ,x:x+w] = fillcolor
+        self.gram_buffer[y:y+h ,x:x+w] = fillcolor
+
+
+    def fillChunk(self, color):
+        """ *NOT PART OF THE API*
+            Returns a block of bytes, as big as the SPI buffer, filled with a color ready to be sent.
+            The blocks of the latest colors are kept to avoid building them again.
+        """
+        chunk = self.fill_chunks.get(color)
+        if chunk is None:
+            chunk = wireBytes(np.full((self.spi_buffer_size // 2,), color, dtype=np.uint16))
+            self.fill_chunks.put(color, chunk)
+        return chunk
 
 
 
@@ -494,55 +930,8 @@ class SSD1351:
         Nothing
 
         """
-        # Bounds check
-        if x >= self.SSD1351WIDTH or y >= self.SSD1351HEIGHT:
-            return
-
-        # X bounds check
-        if x+w > self.SSD1351WIDTH:
-            w = self.SSD1351WIDTH - x - 1
-        if w < 0:
-            return
-
-
-        #Check if optimization is actually convinient
-        # if self.optimization:
-        #     total_pixels = float(w)
-        #     time_normal = total_pixels/597956       #597956 pixels/sec  is the Normal speed of the fillRect function
-        #     painted_pixels = [tt for tt in np.asarray(np.unique(self.frame_buffer[x:x+w ,y],return_counts=True)).T  if color in tt]
-        #     if painted_pixels == []: painted_pixels = 0 #Border case where there are no painted pixels
-        #     else: painted_pixels = painted_pixels[0][1]
-        #     pixels_to_paint = total_pixels - painted_pixels
-        #     time_pixelated = float(pixels_to_paint)/2501 #874 pixels/sec  is the Normal speed of the drawPixel function
-        #     # print "fillRect = {}ms,  drawPixel = {}ms for {}pixels totals and {}pixels real".format(time_normal*1000,time_pixelated*1000,total_pixels,pixels_to_paint)
-        #     if time_pixelated < time_normal:
-        #         print "pixelado!"
-        #         [self.drawPixel(x1,y,color) for x1 in range(x,x+w)]
-
-        #         #Escribimos en el frame_buffer
-        #         block = np.full((w,),color)
-        #         self.frame_buffer[x:x+w ,y] = block
-        #         return
-
-        # set location
-        self.writeCommand(self.CMD_SETCOLUMN)
-        self.writeData([x,x+w-1])
-        # self.writeData(x+w-1)
-        self.writeCommand(self.CMD_SETROW)
-        self.writeData([y,y])
-        # self.writeData(y)
-        # fill!
-        self.writeCommand(self.CMD_WRITERAM)
-
-        self.writeData([color >> 8,color] * w)
-        # for i in range(w):                                ##### Quizas se puede mejorar con un map
-        #    self.writeData(color >> 8)
-        #    self.writeData(color)
-
-        #Escribimos en el frame_buffer
-        block = np.full((w,),color)
-        self.frame_buffer[x:x+w ,y] = block
-        return
+        #It's just a rectangle one pixel high
+        self.fillRect(x, y, w, 1, color)
 
 
 
@@ -573,54 +962,8 @@ class SSD1351:
 
         """
 
-        # Bounds check
-        if x >= self.SSD1351WIDTH or y >= self.SSD1351HEIGHT:
-            return
-
-        # X bounds check
-        if y+h > self.SSD1351HEIGHT:
-            h = self.SSD1351HEIGHT - y - 1
-        if h < 0:
-            return
-
-        #Check if optimization is actually convinient
-        # if self.optimization:
-        #     total_pixels = float(h)
-        #     time_normal = total_pixels/597956       #3649 pixels/sec  is the Normal speed of the fillRect function
-        #     painted_pixels = [tt for tt in np.asarray(np.unique(self.frame_buffer[x,y:y+h],return_counts=True)).T  if color in tt]
-        #     if painted_pixels == []: painted_pixels = 0 #Border case where there are no painted pixels
-        #     else: painted_pixels = painted_pixels[0][1]
-        #     pixels_to_paint = total_pixels - painted_pixels
-        #     time_pixelated = float(pixels_to_paint)/2501 #874 pixels/sec  is the Normal speed of the drawPixel function
-        #     print "fillRect = {}ms,  drawPixel = {}ms for {}pixels totals and {}pixels real".format(time_normal*1000,time_pixelated*1000,total_pixels,pixels_to_paint)
-        #     if time_pixelated < time_normal:
-        #         print "pixelado!"
-        #         [self.drawPixel(x,y1,color) for y1 in range(y,y+h)]
-
-        #         #Escribimos en el frame_buffer
-        #         block = np.full((h,),color)
-        #         self.frame_buffer[x ,y:y+h] = block
-        #         return
-
-        # set location
-        self.writeCommand(self.CMD_SETCOLUMN)
-        self.writeData([x,x])
-        # self.writeData(x)
-        self.writeCommand(self.CMD_SETROW)
-        self.writeData([y,y+h-1])
-        # self.writeData(y+h-1)
-        # fill!
-        self.writeCommand(self.CMD_WRITERAM)
-
-        self.writeData([color >> 8,color] * h)
-        # for i in range(h):                                ##### Quizas se puede mejorar con un map
-        #    self.writeData(color >> 8)
-        #    self.writeData(color)
-
-        #Escribimos en el frame_buffer
-        block = np.full((h,),color)
-        self.frame_buffer[x ,y:y+h] = block
-        return
+        #It's just a rectangle one pixel wide
+        self.fillRect(x, y, 1, h, color)
 
 
 # Also necsary for compatibility with the GFX library
@@ -646,6 +989,10 @@ class SSD1351:
 
         """
 
+        #Retained mode, only the frame_buffer gets painted
+        if self.buffered:
+            self.drawPixelFB(x, y, color)
+            return
 
         # Bounds check
         if x >= self.SSD1351WIDTH or y >= self.SSD1351HEIGHT:
@@ -657,7 +1004,8 @@ class SSD1351:
 
         #We check if the pixel is already the color we want
 
-        if self.optimization == True and self.frame_buffer.item((x,y)) == color:
+        if self.optimization == True and self.frame_buffer.item((y,x)) == color:
+            self.counters['pixels_skipped'] += 1
             return
         else:
             # set location
@@ -668,7 +1016,8 @@ class SSD1351:
             # self.writeData(color)
 
             #Now we record the pixel to the frame buffer
-            self.frame_buffer.itemset((x,y),color)
+            self.frame_buffer[y,x] = color
+            self.gram_buffer[y,x] = color
 
 
 
@@ -725,37 +1074,10 @@ class SSD1351:
         Nothing
 
         """
-
-        f = 1 - r
-        ddF_x = 1
-        ddF_y = -2 * r
-        x = 0
-        y = r
-
-        self.drawPixel(x0  , y0+r, color)
-        self.drawPixel(x0  , y0-r, color)
-        self.drawPixel(x0+r, y0  , color)
-        self.drawPixel(x0-r, y0  , color)
-
-        while (x<y):
-
-            if (f >= 0):
-                y     -= 1
-                ddF_y += 2
-                f     += ddF_y
-
-            x += 1
-            ddF_x += 2
-            f += ddF_x
-
-            self.drawPixel(x0 + x, y0 + y, color)
-            self.drawPixel(x0 - x, y0 + y, color)
-            self.drawPixel(x0 + x, y0 - y, color)
-            self.drawPixel(x0 - x, y0 - y, color)
-            self.drawPixel(x0 + y, y0 + x, color)
-            self.drawPixel(x0 - y, y0 + x, color)
-            self.drawPixel(x0 + y, y0 - x, color)
-            self.drawPixel(x0 - y, y0 - x, color)
+        xs, ys = circleTable(r)
+        px = np.concatenate(([0, 0, r, -r], xs, -xs, xs, -xs, ys, -ys, ys, -ys))
+        py = np.concatenate(([r, -r, 0, 0], ys, ys, -ys, -ys, xs, xs, -xs, -xs))
+        self.drawPoints(x0 + px, y0 + py, color)
 
 
     def drawCircleHelper(self, x0, y0, r, cornername, color):
@@ -786,39 +1108,34 @@ class SSD1351:
         Nothing
 
         """
-        f     = 1 - r
-        ddF_x = 1
-        ddF_y = -2 * r
-        x     = 0
-        y     = r
+        px, py = self.circlePoints(x0, y0, r, cornername)
+        self.drawPoints(px, py, color)
 
-        while (x<y):
 
-            if (f >= 0):
-                y     -= 1
-                ddF_y += 2
-                f     += ddF_y
-
-            x     += 1
-            ddF_x += 2
-            f     += ddF_x
-
-            if (cornername & 0x4) != 0:
-                self.drawPixel(x0 + x, y0 + y, color)
-                self.drawPixel(x0 + y, y0 + x, color)
+    def circlePoints(self, x0, y0, r, cornername):
+        """ *NOT PART OF THE API*
+            Points of the quarters of circle drawn by drawCircleHelper(), as two ndarrays (xs, ys).
+        """
+        xs, ys = circleTable(r)
+        px = [xs[:0]]
+        py = [ys[:0]]
+        if (cornername & 0x4) != 0:
+            px += [x0 + xs, x0 + ys]
+            py += [y0 + ys, y0 + xs]
 
-            if (cornername & 0x2) != 0:
-                self.drawPixel(x0 + x, y0 - y, color)
-                self.drawPixel(x0 + y, y0 - x, color)
+        if (cornername & 0x2) != 0:
+            px += [x0 + xs, x0 + ys]
+            py += [y0 - ys, y0 - xs]
 
-            if (cornername & 0x8) != 0:
-                self.drawPixel(x0 - y, y0 + x, color)
-                self.drawPixel(x0 - x, y0 + y, color)
+        if (cornername & 0x8) != 0:
+            px += [x0 - ys, x0 - xs]
+            py += [y0 + xs, y0 + ys]
 
-            if (cornername & 0x1) != 0:
-                self.drawPixel(x0 - y, y0 - x, color)
-                self.drawPixel(x0 - x, y0 - y, color)
+        if (cornername & 0x1) != 0:
+            px += [x0 - ys, x0 - xs]
+            py += [y0 - xs, y0 - ys]
 
+        return np.concatenate(px), np.concatenate(py)
 
 
     # Used to do circles and roundrects
@@ -853,30 +1170,30 @@ class SSD1351:
         Nothing
 
         """
-        f     = 1 - r
-        ddF_x = 1
-        ddF_y = -2 * r
-        x     = 0
-        y     = r
-
-        while (x<y):
+        xs, tops, heights = self.circleSpans(x0, y0, r, cornername, delta)
+        self.drawSpans(xs, tops, heights, color)
 
-            if (f >= 0):
-                y     -= 1
-                ddF_y += 2
-                f     += ddF_y
 
-            x     += 1
-            ddF_x += 2
-            f     += ddF_x
+    def circleSpans(self, x0, y0, r, cornername, delta):
+        """ *NOT PART OF THE API*
+            Vertical spans of the halves of circle filled by fillCircleHelper(), as three ndarrays
+            (xs, tops, heights).
+        """
+        xs, ys = circleTable(r)
+        cx = [xs[:0]]
+        top = [xs[:0]]
+        height = [xs[:0]]
+        if (cornername & 0x1) != 0:
+            cx += [x0 + xs, x0 + ys]
+            top += [y0 - ys, y0 - xs]
+            height += [2*ys+1+delta, 2*xs+1+delta]
 
-            if (cornername & 0x1) != 0:
-              self.drawFastVLine(x0+x, y0-y, 2*y+1+delta, color)
-              self.drawFastVLine(x0+y, y0-x, 2*x+1+delta, color)
+        if (cornername & 0x2) != 0:
+            cx += [x0 - xs, x0 - ys]
+            top += [y0 - ys, y0 - xs]
+            height += [2*ys+1+delta, 2*xs+1+delta]
 
-            if (cornername & 0x2) != 0:
-              self.drawFastVLine(x0-x, y0-y, 2*y+1+delta, color)
-              self.drawFastVLine(x0-y, y0-x, 2*x+1+delta, color)
+        return np.concatenate(cx), np.concatenate(top), np.concatenate(height)
 
 
     def fillCircle(self, x0, y0, r, color):
@@ -903,9 +1220,9 @@ class SSD1351:
         Nothing
 
         """
-
-        self.drawFastVLine(x0, y0-r, 2*r+1, color)
-        self.fillCircleHelper(x0, y0, r, 3, 0, color)
+        #The center column and both halves, all at once
+        xs, tops, heights = self.circleSpans(x0, y0, r, 3, 0)
+        self.drawSpans(np.append(xs, x0), np.append(tops, y0-r), np.append(heights, 2*r+1), color)
 
 
     #We define the swap Macro
@@ -960,7 +1277,7 @@ class SSD1351:
         dx = x1 - x0
         dy = abs(y1 - y0)
 
-        err = dx / 2        # in Python 3 you should perform an explicit float --> int convertion, here it's fine, due to the integer division thingy in python 2
+        err = dx // 2
         ystep = 0
 
         if (y0 < y1):
@@ -968,17 +1285,90 @@ class SSD1351:
         else:
             ystep = -1
 
-        #for (; x0<=x1; x0++) {
-        for x0 in range(x0,x1+1):
-            if (steep):
-                self.drawPixel(y0, x0, color)
-            else:
-                self.drawPixel(x0, y0, color)
+        #All the points at once. The error starts at dx/2 and loses dy on every step, each time it
+        #goes below 0 we move one step in y (and it gets dx back). So, at the point i we have moved
+        #ceil((i*dy - dx/2) / dx) steps, never less than 0. The same points as the classic loop.
+        i = np.arange(dx + 1)
+        if dx > 0:
+            moves = np.maximum(-((err - i * dy) // dx), 0)
+        else:
+            moves = np.zeros_like(i)
+        xs = x0 + i
+        ys = y0 + ystep * moves
+
+        if (steep):
+            self.drawPoints(ys, xs, color)
+        else:
+            self.drawPoints(xs, ys, color)
+
+    def drawPoints(self, xs, ys, color):
+        """ *NOT PART OF THE API*
+            Paints a set of pixels of the same color at once. They go to the frame_buffer, and
+            (unless we are in buffered mode) the changes inside their bounding box are sent
+            following the flush strategy, as a few windows instead of a window per pixel.
+
+
+        Parameters
+        ----------
+        xs : ndarray of ints.
+            Horizontal coordinates of the pixels. Those outside the screen are ignored.
+
+        ys : ndarray of ints.
+            Vertical coordinates of the pixels.
+
+        color : uint16.
+            Color of the pixels, represented as a 16bit integer (e.g. 0xF800).
+
+        Returns
+        --------
+        Nothing
+
+        """
+        inside = (xs >= 0) & (xs < self.SSD1351WIDTH) & (ys >= 0) & (ys < self.SSD1351HEIGHT)
+        xs = xs[inside]
+        ys = ys[inside]
+        if len(xs) == 0:
+            return
+
+        self.frame_buffer[ys, xs] = color
+
+        x, y = int(xs.min()), int(ys.min())
+        w, h = int(xs.max()) - x + 1, int(ys.max()) - y + 1
+        if self.buffered:
+            self.markDirty(x, y, w, h)
+        else:
+            self.updateRegion(x, y, w, h)
+
+
+    def drawSpans(self, xs, ys, lengths, color, vertical = True):
+        """ *NOT PART OF THE API*
+            Paints a set of vertical (or horizontal) lines of the same color at once, with
+            drawPoints(). Each line starts at (xs[i], ys[i]) and is lengths[i] pixels long.
+        """
+        xs, ys, lengths = np.broadcast_arrays(np.asarray(xs, dtype=np.int64), np.asarray(ys, dtype=np.int64),
+                                              np.asarray(lengths, dtype=np.int64))
+        #Clipped to the screen before they are turned into pixels, they can be huge
+        if vertical:
+            ends = np.minimum(ys + lengths, self.SSD1351HEIGHT)
+            ys = np.maximum(ys, 0)
+            lengths = ends - ys
+            inside = (xs >= 0) & (xs < self.SSD1351WIDTH) & (lengths > 0)
+        else:
+            ends = np.minimum(xs + lengths, self.SSD1351WIDTH)
+            xs = np.maximum(xs, 0)
+            lengths = ends - xs
+            inside = (ys >= 0) & (ys < self.SSD1351HEIGHT) & (lengths > 0)
+        xs, ys, lengths = xs[inside], ys[inside], lengths[inside]
+
+        starts = np.cumsum(lengths) - lengths
+        offsets = np.arange(lengths.sum()) - np.repeat(starts, lengths)
+        xs = np.repeat(xs, lengths)
+        ys = np.repeat(ys, lengths)
+        if vertical:
+            self.drawPoints(xs, ys + offsets, color)
+        else:
+            self.drawPoints(xs + offsets, ys, color)
 
-            err -= dy
-            if (err < 0):
-                y0 += ystep
-                err += dx
 
 #Draws empty rectangles
     def drawRect(self, x, y, w, h,color):
@@ -1044,16 +1434,17 @@ class SSD1351:
         Nothing
 
         """
-        #  smarter version
-        self.drawFastHLine(x+r  , y    , w-2*r, color) #  Top
-        self.drawFastHLine(x+r  , y+h-1, w-2*r, color) #  Bottom
-        self.drawFastVLine(x    , y+r  , h-2*r, color) #  Left
-        self.drawFastVLine(x+w-1, y+r  , h-2*r, color) #  Right
-        #  draw four corners
-        self.drawCircleHelper(x+r    , y+r    , r, 1, color)
-        self.drawCircleHelper(x+w-r-1, y+r    , r, 2, color)
-        self.drawCircleHelper(x+w-r-1, y+h-r-1, r, 4, color)
-        self.drawCircleHelper(x+r    , y+h-r-1, r, 8, color)
+        #  smarter version, every point at once
+        top = np.arange(x+r, x+w-r)
+        side = np.arange(y+r, y+h-r)
+        px = [top, top, np.full_like(side, x), np.full_like(side, x+w-1)]       #  Top, Bottom, Left, Right
+        py = [np.full_like(top, y), np.full_like(top, y+h-1), side, side]
+        #  four corners
+        for cx, cy, corner in ((x+r, y+r, 1), (x+w-r-1, y+r, 2), (x+w-r-1, y+h-r-1, 4), (x+r, y+h-r-1, 8)):
+            cpx, cpy = self.circlePoints(cx, cy, r, corner)
+            px.append(cpx)
+            py.append(cpy)
+        self.drawPoints(np.concatenate(px), np.concatenate(py), color)
 
 
 # Fill a rounded rectangle
@@ -1087,12 +1478,13 @@ class SSD1351:
         Nothing
 
         """
-        #  smarter version
-        self.fillRect(x+r, y, w-2*r, h, color)
-
-        #  draw four corners
-        self.fillCircleHelper(x+w-r-1, y+r, r, 1, h-2*r-1, color)
-        self.fillCircleHelper(x+r    , y+r, r, 2, h-2*r-1, color)
+        #  smarter version, the middle columns and the corners all at once
+        columns = np.arange(x+r, x+w-r)
+        rx, rtop, rh = self.circleSpans(x+w-r-1, y+r, r, 1, h-2*r-1)
+        lx, ltop, lh = self.circleSpans(x+r    , y+r, r, 2, h-2*r-1)
+        self.drawSpans(np.concatenate((columns, rx, lx)),
+                       np.concatenate((np.full_like(columns, y), rtop, ltop)),
+                       np.concatenate((np.full_like(columns, h), rh, lh)), color)
 
 
 #  Draw a triangle
@@ -1169,11 +1561,6 @@ class SSD1351:
         Nothing
 
         """
-        a = 0
-        b = 0
-        y = 0
-        last = 0
-
         #  Sort coordinates by Y order (y2 >= y1 >= y0)
         if (y0 > y1):
             y0, y1 = self.swap(y0, y1)
@@ -1189,79 +1576,36 @@ class SSD1351:
 
 
         if(y0 == y2):  #  Handle awkward all-on-same-line case as its own thing
-            b = x0
-            a = x0
-
-            if   (x1 < a): a = x1
-            elif (x1 > b): b = x1
-
-            if   (x2 < a): a = x2
-            elif (x2 > b): b = x2
-
+            a = min(x0, x1, x2)
+            b = max(x0, x1, x2)
             self.drawFastHLine(a, y0, b-a+1, color)
             return
 
+        #  Every scanline at once. For the upper part of the triangle the crossings are with the
+        #  segments 0-1 and 0-2, for the lower part with 1-2 and 0-2. If y1=y2 (flat-bottomed
+        #  triangle) the scanline y1 belongs to the upper part, otherwise to the lower one, so
+        #  a flat-topped triangle (y0=y1) is all lower part. This way no segment with dy=0 is
+        #  ever used, and there is no division by zero.
+        if (y1 == y2):  last = y1   #  Include y1 scanline
+        else:           last = y1-1 #  Skip it
+
+        #  Only the scanlines on the screen
+        ys = np.arange(max(y0, 0), min(y2, self.SSD1351HEIGHT-1)+1, dtype=np.int64)
+        if len(ys) == 0:
+            return
+        upper = ys <= last
+        # a = x0 + (x1 - x0) * (y - y0) / (y1 - y0)   (upper)
+        # a = x1 + (x2 - x1) * (y - y1) / (y2 - y1)   (lower)
+        # b = x0 + (x2 - x0) * (y - y0) / (y2 - y0)
+        a = np.where(upper,
+                     x0 + ((x1 - x0) * (ys - y0)) // max(y1 - y0, 1),
+                     x1 + ((x2 - x1) * (ys - y1)) // max(y2 - y1, 1))
+        b = x0 + ((x2 - x0) * (ys - y0)) // (y2 - y0)
 
-        # int16_t
-        dx01 = x1 - x0
-        dy01 = y1 - y0
-        dx02 = x2 - x0
-        dy02 = y2 - y0
-        dx12 = x2 - x1
-        dy12 = y2 - y1
-        # int32_t
-        sa   = 0
-        sb   = 0
-
-          #  For upper part of triangle, find scanline crossings for segments
-          #  0-1 and 0-2.  If y1=y2 (flat-bottomed triangle), the scanline y1
-          #  is included here (and second loop will be skipped, avoiding a /0
-          #  error there), otherwise scanline y1 is skipped here and handled
-          #  in the second loop...which also avoids a /0 error here if y0=y1
-          #  (flat-topped triangle).
-
-        if (y1 == y2):  last = y1;   #  Include y1 scanline
-        else:           last = y1-1; #  Skip it
-
-          # for(y=y0; y<=last; y++) {
-        for y in xrange(y0,last+1):
-
-            if dy01 == 0 or dy02 == 0: continue
-
-            a   = x0 + sa / dy01
-            b   = x0 + sb / dy02
-            sa += dx01
-            sb += dx02
-            # /* longhand
-            # a = x0 + (x1 - x0) * (y - y0) / (y1 - y0);
-            # b = x0 + (x2 - x0) * (y - y0) / (y2 - y0);
-            # */
-
-            if (a > b): a,b = self.swap(a,b)
-            self.drawFastHLine(a, y, b-a+1, color)
-
-        # For lower part of triangle, find scanline crossings for segments
-        # 0-2 and 1-2.  This loop is skipped if y1=y2.
-        sa = dx12 * (y - y1)
-        sb = dx02 * (y - y0)
-
-# I belive this function has an error here somewhere, that generates division by 0, but not sure where.
-
-        # for(; y<=y2; y++) {
-        for y in xrange(y,y2+1):
-
-            if dy02 == 0 or dy12 == 0: continue
-
-            a   = x1 + sa / dy12
-            b   = x0 + sb / dy02
-            sa += dx12
-            sb += dx02
-            # /* longhand:
-            # a = x1 + (x2 - x1) * (y - y1) / (y2 - y1);
-                # b = x0 + (x2 - x0) * (y - y0) / (y2 - y0);
-            # */
-            if(a > b): a,b =  self.swap(a,b)
-            self.drawFastHLine(a, y, b-a+1, color)
+        left = np.maximum(np.minimum(a, b), 0)
+        right = np.minimum(np.maximum(a, b), self.SSD1351WIDTH-1)
+        inside = left <= right
+        self.drawSpans(left[inside], ys[inside], (right - left + 1)[inside], color, vertical = False)
 
 
 
@@ -1276,10 +1620,12 @@ class SSD1351:
         Parameters
         ----------
         x : uint8.
-            Horizontal position of the cursor, accepted values are from 0 to 21.
+            Horizontal position of the cursor, accepted values are from 0 to 20.
+            (in characters of the current text size, from 0 to 9 for size 2 and so on)
 
         y : uint8.
-            Vertical position of the cursor, accepted values are from 0 to 16.
+            Vertical position of the cursor, accepted values are from 0 to 15.
+            (in characters of the current text size, from 0 to 7 for size 2 and so on)
 
 
         Returns
@@ -1288,11 +1634,14 @@ class SSD1351:
 
         """
         #Bound check
-        if (x > self.SSD1351WIDTH/self.font_size_x): x = int(x > self.SSD1351WIDTH/self.font_size_x - 1)
-        if (y > self.SSD1351HEIGHT/self.font_size_y): y = int(x > self.SSD1351HEIGHT/self.font_size_y - 1)
+        columns = self.SSD1351WIDTH // (self.font.width * self.text_size)
+        rows = self.SSD1351HEIGHT // (self.font.height * self.text_size)
+        if (x >= columns): x = columns - 1
+        if (y >= rows): y = rows - 1
 
-        self.cursor_x = x
-        self.cursor_y = y
+        #The cursor is kept in pixels
+        self.cursor_x = x * self.font.width * self.text_size
+        self.cursor_y = y * self.font.height * self.text_size
 
     def getCursor(self):
         """ Returns the current position of the writing cursor
@@ -1306,15 +1655,60 @@ class SSD1351:
         Returns
         --------
         out : two-tuple.
-            Tuple with (X,Y) with the current position of the writing cursor.
+            Tuple with (X,Y) with the current position of the writing cursor, in characters
+            of the current font and text size.
 
         """
-        return (self.cursor_x, self.cursor_y)
+        return (self.cursor_x // (self.font.width * self.text_size), self.cursor_y // (self.font.height * self.text_size))
+
+
+    def setTextSize(self, size):
+        """ Sets the scaling factor of the text printed by write(). Each pixel of the font becomes a
+            (size x size) square, so the characters are 6*size pixels wide and 8*size pixels tall.
+            The writing cursor stays on the same pixel.
+
+
+        Parameters
+        ----------
+        size : uint8.
+            Scaling factor of the font, 1 is the normal 6x8 size.
+
+        Returns
+        --------
+        Nothing
+
+        """
+        self.text_size = max(int(size), 1)
+
+
+    def setFont(self, font = None):
+        """ Selects the font used by write() and drawChar(). The fonts are loaded with the functions
+            of fonts.py (e.g. loadBDF('helvR08.bdf')), and can be shared by several displays.
+
+
+        Parameters
+        ----------
+        font : Font.
+            Font to write with, the 5x8 font of "glcdfont.py" if it's None.
+            default => None
+
+        Returns
+        --------
+        Nothing
+
+        """
+        if font is None:
+            font = defaultFont()
+        self.font = font
+        #Size of the character cell, without the separation
+        self.font_size_x = font.width - 1
+        self.font_size_y = font.height
 
 
-#It still doesn't support variable size letters
     def drawChar(self, x, y, c,  color= 0xffff, bg = 0x0000,  size = 1):
-        """ Prints an 6x8 ASCII character anywhere on the screen, as defined by the font on "glcdfont.py"
+        """ Prints a character anywhere on the screen, with the current font (by default the 6x8 font
+            defined on "glcdfont.py", see setFont()).
+            With a "size" bigger than 1 the character is scaled up, to (6*size)x(8*size) pixels.
 
 
         Parameters
@@ -1327,7 +1721,7 @@ class SSD1351:
 
         c : char, uint8.
             Character to print, may also be a number from 0 to 254 if you want to directly
-            reference the font array.
+            reference the glyphs of the font.
 
         color : uint16.
             Color of the pixels needed to draw the charater, represented as a 16bit integer (e.g. 0xF800).
@@ -1338,7 +1732,8 @@ class SSD1351:
             default => BLACK
 
         size : uint8.
-            Scaling factor for the size of the font. *NOT IMPLEMENTED*
+            Scaling factor for the size of the font, each pixel becomes a (size x size) square.
+            default => 1
 
 
         Returns
@@ -1347,33 +1742,51 @@ class SSD1351:
 
         """
         #Bounds check
-        if ((x >= self.SSD1351WIDTH) or (y >= self.SSD1351HEIGHT) or ((x + (self.font_size_x + 1) * size - 1) < 0) or ((y + self.font_size_y * size - 1) < 0)):
+        if ((x >= self.SSD1351WIDTH) or (y >= self.SSD1351HEIGHT) or ((x + self.font.width * size - 1) < 0) or ((y + self.font.height * size - 1) < 0)):
             return
 
-        if type(c) == str:
-            #Convert charater to index
-            letter = ord(c) & 0x7F
-            if letter < 0: letter = 0
-            # else: letter -= ord(' ')    #The Adafruit font already knows where to start. 32 is "space"
-        elif type(c) == int:
-            letter = c
-        else: return
+        letter = self.font.glyphIndex(c)
+        if letter is None:
+            return
+
+        bitmap, blob = self.glyph(letter, color, bg, size)
+
+        h, w = bitmap.shape
+        if self.buffered or x < 0 or y < 0 or x + w > self.SSD1351WIDTH or y + h > self.SSD1351HEIGHT:
+            #The frame_buffer or the clipping of drawBitmap() take care of it
+            self.drawBitmap(bitmap, x, y)
+            return
 
-        #We create a flat list of each color that it's needed to draw the letter.
-        letter_bits = np.unpackbits(np.asarray(np.append(self.font[letter],[0]),dtype = np.uint8) )
-        letter_bits = np.asarray(map(lambda x:(bg,color)[x == 1], letter_bits) ,dtype = np.uint16) #We change the bit array to a color/background array
-        letter_array = np.flipud(np.reshape(letter_bits,(6,8)).T) #Reorient the array
-        self.drawBitmap(letter_array,x,y)
+        #One window and one transfer, the bytes are already in the order of the screen
+        with self.writing():
+            self.setAddrWindow(x, y, w, h)
+            self.writeData(blob)
+        self.frame_buffer[y:y+h,x:x+w] = bitmap
+        self.gram_buffer[y:y+h,x:x+w] = bitmap
 
-        # for j in xrange(self.font_size_x + 1):    #The adafruit glcd font only stores 5 of the 6 columns of the fonts. to save space.
-        #     for i in xrange(self.font_size_y):
-        #         if (j < self.font_size_x):  line = self.font[letter][j]
-        #         else: line = 0x00 #This is the separator between the characters
-        #         if ( line & (0x01 << i) != 0 ):
-        #             self.drawPixelFB(x+j,y+i,color)
-        #         elif bg == None: continue
-        #         else:
-        #             self.drawPixelFB(x+j,y+i,bg)
+
+    def scaleMask(self, mask, size):
+        """ *NOT PART OF THE API*
+            Scales up a 2-dimensional ndarray, each element becomes a (size x size) square.
+        """
+        if size == 1:
+            return mask
+        return np.repeat(np.repeat(mask, size, axis=0), size, axis=1)
+
+
+    def glyph(self, letter, color, bg, size = 1):
+        """ *NOT PART OF THE API*
+            Returns a glyph of the current font painted with a color and a background, and scaled by
+            "size", as a 16bit color ndarray and as the big-endian bytes to send.
+            The latest ones are kept.
+        """
+        key = (self.font, letter, color, bg, size)
+        glyph = self.glyph_cache.get(key)
+        if glyph is None:
+            bitmap = np.where(self.scaleMask(self.font.render([letter]), size), color, bg).astype(np.uint16)
+            glyph = (bitmap, wireBytes(bitmap))
+            self.glyph_cache.put(key, glyph)
+        return glyph
 
 
 
@@ -1382,15 +1795,16 @@ class SSD1351:
     def write(self, text, color= 0xffff, bg = 0x0000 ):
         """ Prints an string on the screen on the current position of the writing cursor.
             the writing cursor self actualizes and automatically wraps the text.
-            '\n' charater is supported.
-            uses the 6x8 font defined  on "glcdfont.py"
+            '\n' charater is supported. In terminal mode (see setTerminal()) the text scrolls up
+            when it reaches the bottom, otherwise it goes back to the top.
+            uses the current font (see setFont()), scaled by the text size (see setTextSize())
 
 
         Parameters
         ----------
         text : string, list of ints.
-            String to be printed on the screen, may also be a list of integers representing positions
-            on the font array.
+            String to be printed on the screen, may also be a list of integers representing glyphs
+            of the font.
 
         color : uint16.
             Color of the pixels needed to draw the charater, represented as a 16bit integer (e.g. 0xF800).
@@ -1406,51 +1820,170 @@ class SSD1351:
         Nothing
 
         """
+        #Python 2 strings are bytes, the characters are what they encode
+        if type(text) == bytes and bytes is str:
+            text = text.decode('utf-8', 'replace')
+
+        #Size of each character on the screen
+        font = self.font
+        size = self.text_size
+        char_w = font.width * size
+        char_h = font.height * size
+
+        #The characters that go one after the other on the same row are drawn together
+        run = []
+        run_x, run_y = self.cursor_x, self.cursor_y
         for c in text:
             if c == '\n':
+                self.drawText(run, run_x, run_y, color, bg)
+                run = []
                 self.cursor_x = 0
-                self.cursor_y += 1
+                if self.terminal and self.cursor_y + char_h > self.SSD1351HEIGHT - char_h:
+                    self.scrollText(char_h, bg)
+                else:
+                    self.cursor_y += char_h
             else:
-                if c == '°':  c = [247]               #Font number for the little degree circle
-
-                self.drawChar(self.cursor_x * (self.font_size_x + 1) , self.cursor_y * self.font_size_y, c, color,bg )
-                self.cursor_x += 1
-                if self.cursor_x * (self.font_size_x + 1) > self.SSD1351WIDTH - (self.font_size_x + 1):
+                letter = font.glyphIndex(c)
+                if letter is None:
+                    #Nothing to draw
+                    continue
+                if not run:
+                    run_x, run_y = self.cursor_x, self.cursor_y
+                run.append(letter)
+                self.cursor_x += int(font.advances[letter]) * size
+                if self.cursor_x > self.SSD1351WIDTH - char_w:
                     #Wrap!
+                    self.drawText(run, run_x, run_y, color, bg)
+                    run = []
                     self.cursor_x = 0
-                    self.cursor_y += 1
+                    self.cursor_y += char_h
                     #Bound check on the Y axis
-                    if self.cursor_y * self.font_size_y > self.SSD1351HEIGHT - self.font_size_y:
+                    if self.terminal and self.cursor_y > self.SSD1351HEIGHT - char_h:
+                        #The text goes up, the cursor stays on the last line
+                        self.cursor_y -= char_h
+                        self.scrollText(char_h, bg)
+                    elif self.cursor_y > self.SSD1351HEIGHT - char_h:
                         #Back to the start
                         self.cursor_x = 0
                         self.cursor_y = 0
+        self.drawText(run, run_x, run_y, color, bg)
+
+
+    def drawText(self, letters, x, y, color, bg):
+        """ *NOT PART OF THE API*
+            Draws a row of glyphs of the current font and text size, starting at (x, y), as a
+            single bitmap sent in one window.
+        """
+        if not letters:
+            return
+        size = self.text_size
+        if self.terminal and y < self.SSD1351HEIGHT:
+            #Row of the screen's RAM that is shown at "y"
+            y = (y + self.start_line) % self.SSD1351HEIGHT
+            if y + self.font.height * size > self.SSD1351HEIGHT:
+                #It goes past the end of the RAM, the rest is at the start
+                bitmap = np.where(self.scaleMask(self.font.render(letters), size), color, bg).astype(np.uint16)
+                split = self.SSD1351HEIGHT - y
+                self.drawBitmap(bitmap[:split], x, y)
+                self.drawBitmap(bitmap[split:], x, 0)
+                return
+        if len(letters) == 1:
+            self.drawChar(x, y, letters[0], color, bg, size)
+            return
+        if x >= self.SSD1351WIDTH or y >= self.SSD1351HEIGHT:
+            return
+
+        #The glyphs side by side, straight from the atlas of the font
+        masks = self.scaleMask(self.font.render(letters), size)
+        self.drawBitmap(np.where(masks, color, bg).astype(np.uint16), x, y)
+
+
+    def setTerminal(self, v):
+        """ Enables or disables the terminal mode of write(). In terminal mode, when the text
+            reaches the bottom of the screen everything moves up one line, like on a console,
+            instead of going back to the top. The screen's RAM is used as a ring: only the start
+            line of the screen is moved, and just the new (blank) line is sent.
+
+            While it's enabled, the text uses the rows as they are seen, but the rest of the
+            drawing functions use the rows of the screen's RAM (the frame_buffer), that are
+            shifted by "start_line". Disabling it sends the whole frame_buffer again, with the
+            rows in their place.
+
+
+        Parameters
+        ----------
+        v : boolean.
+            TRUE  =>  The text scrolls up at the bottom of the screen
+            FALSE =>  The text goes back to the top
+
+        Returns
+        --------
+        Nothing
+
+        """
+        if self.terminal and not v and self.start_line != 0:
+            #Put the rows back in their place
+            self.frame_buffer[:] = np.roll(self.frame_buffer, -self.start_line, axis=0)
+            with self.writing():
+                self.setStartLine(0)
+                self.display(True)
+        self.terminal = bool(v)
+
+
+    def setStartLine(self, line):
+        """ *NOT PART OF THE API*
+            Sets the row of the screen's RAM that is shown on the top of the screen.
+        """
+        self.start_line = line % self.SSD1351HEIGHT
+        self.writeCommand(self.CMD_STARTLINE)
+        self.writeData(self.start_line)
+
 
-        # # We draw the letter as a bitmap
-        # print "almost in"
-        # self.drawBitmap(self.frame_buffer[init_y*self.font_size_y:(self.cursor_y + 1)*self.font_size_y,init_x*self.font_size_x:(self.cursor_x + 1)*self.font_size_x], init_y*self.font_size_y, init_x*self.font_size_x)
-        # print "out!"
+    def scrollText(self, h, bg):
+        """ *NOT PART OF THE API*
+            Terminal mode: moves everything up "h" rows, and clears with "bg" the line that
+            appears at the bottom. Only that line is sent.
+        """
+        with self.writing():
+            self.setStartLine(self.start_line + h)
+
+            #The last line of text (and whatever is left below it) shows what was on the top
+            top = (self.SSD1351HEIGHT // h - 1) * h
+            y = (top + self.start_line) % self.SSD1351HEIGHT
+            rows = self.SSD1351HEIGHT - top
+            first = min(rows, self.SSD1351HEIGHT - y)
+            self.fillRect(0, y, self.SSD1351WIDTH, first, bg)
+            if rows > first:
+                self.fillRect(0, 0, self.SSD1351WIDTH, rows - first, bg)
 
 
 #Draw bitmap (the bitmap is a numpy array)
-    def drawBitmap(self, bitmap, x, y):
-        """ Draws an image to the screen. The image must be a two-dimensional numpy array with each
-        element being a 16bit color integer(NOT an RGB tuple).
+    def drawBitmap(self, bitmap, x, y, src = None):
+        """ Draws an image to the screen. The image is a two-dimensional numpy array with each
+        element being a 16bit color integer, or an RGB image (converted on the fly, see
+        convertBitmap565()).
 
-        NOTE: if the image is too big for the screen, or positioned in such a way that it doesn't fit the
-        screen. Nothing will be displayed, the function will just return.
+        The parts of the image that fall outside the screen are left out, and only a rectangle
+        of the image may be drawn (e.g. a sprite of a sprite sheet). What is left is sent in a
+        single window, without copying the image when it's already 16bit big-endian.
 
 
         Parameters
         ----------
-        bitmap : 2-dimensional ndarray.
+        bitmap : ndarray.
             image to be drawn on the screen
 
-        x : uint8.
+        x : int.
             Horizontal coordinate of the top-left corner of the image, in pixels.
 
-        y : uint8.
+        y : int.
             Vertical coordinate of the top-left corner of the image, in pixels.
 
+        src : four-tuple.
+            (x, y, w, h) rectangle of the image to draw, in pixels of the image. Its top-left
+            corner is the one placed at (x, y). None draws the whole image.
+            default => None
+
 
         Returns
         --------
@@ -1458,66 +1991,62 @@ class SSD1351:
 
         """
 
-
-
-        w = bitmap.shape[1]
-        h = bitmap.shape[0]
-
-        # Bounds check
-        if x >= self.SSD1351WIDTH or y >= self.SSD1351HEIGHT:
+        #Retained mode, only the frame_buffer gets painted
+        if self.buffered:
+            self.drawBitmapFB(bitmap, x, y, src)
             return
 
-        if y+h > self.SSD1351HEIGHT:
+        blit = self.blitRegion(bitmap, x, y, src)
+        if blit is None:
             return
+        pixels, x, y = blit
+        h, w = pixels.shape
 
-        if x+w > self.SSD1351WIDTH:
-            return
-
-
-        # If the image is not transformed to 16bits color
-        if len(bitmap.shape) == 3:
-            return
-            # bitmap565 = np.zeros_like(bitmap[:,:,0],dtype=np.uint16)
-            # for j in range(bitmap.shape[0]):
-            #     for k in range(bitmap.shape[1]):
-            #         bitmap565.itemset((j,k), self.color565(bitmap[j][k]))
-            # # Transform the array into a list
-            # bitmap = [ list(z) for z in bitmap565]
+        # set location
+        with self.writing():
+            self.setAddrWindow(x, y, w, h)
 
+            #Write the bitmap, as big-endian bytes straight from the array
+            self.writeData(pixels)
+        self.frame_buffer[y:y+h,x:x+w] = pixels
+        self.gram_buffer[y:y+h,x:x+w] = pixels
 
-        flat_bitmap = [int(item) for sublist in bitmap for item in sublist]
-        # flat_bitmap = [int(i) for i in flat_bitmap]
-        flat_bitmap2 = [[i >> 8, i] for i in flat_bitmap]
-        flat_bitmap3 = [item for sublist in flat_bitmap2 for item in sublist]
 
-        # set location
-        self.writeCommand(self.CMD_SETCOLUMN)
-        self.writeData([x,x+w-1])
-        # self.writeData(x+w-1)
-        self.writeCommand(self.CMD_SETROW)
+    def blitRegion(self, bitmap, x, y, src = None):
+        """ *NOT PART OF THE API*
+            Finds the part of an image (or of its "src" rectangle) that falls on the screen.
 
-        self.writeData([y,y+h-1])
-        # self.writeData(y+h-1)
-        # fill!
-        self.writeCommand(self.CMD_WRITERAM)
+        Returns
+        --------
+        out : three-tuple or None.
+            (pixels, x, y): a view of the image with the visible pixels (converted to 16bit color
+            if it was RGB) and where they go. None if nothing is visible.
 
-        #Write the bitmap
-        #We try to get around the 4096 buffer size limitation
-        if len(flat_bitmap3) > self.spi_buffer_size:
-        #With this we split the transfer into a lot of 4096 bytes transfers
-            bloques = len(flat_bitmap3)/self.spi_buffer_size
-            sobrante = len(flat_bitmap3)%self.spi_buffer_size
-            # Splitting guide for the array
-            split_guide = [ (i+1)*self.spi_buffer_size for i in xrange(bloques)]
-            # We add the the last division
-            split_guide = split_guide + [split_guide[-1]+sobrante]
-            for block in np.split(np.asarray(flat_bitmap3),split_guide):
-                if len(block) > 0:
-                    self.writeData(list(block))
-            return
+        """
+        if src is not None:
+            sx, sy, sw, sh = src
+            sx, sy = max(sx, 0), max(sy, 0)
+            #What falls before the image is not drawn, the rectangle is smaller
+            sw -= sx - src[0]
+            sh -= sy - src[1]
+            if sw <= 0 or sh <= 0:
+                return None
+            bitmap = bitmap[sy:sy+sh, sx:sx+sw]
+            x += sx - src[0]
+            y += sy - src[1]
+
+        h, w = bitmap.shape[:2]
+        # Bounds check
+        rect = self.clipRect(x, y, w, h)
+        if rect is None:
+            return None
+        cx, cy, cw, ch = rect
+        pixels = bitmap[cy-y:cy-y+ch ,cx-x:cx-x+cw]
 
-        self.writeData(flat_bitmap3)
-        # self.frame_buffer[y:y+h,x:x+w] = bitmap
+        # If the image is not transformed to 16bits color, only the visible part is
+        if pixels.ndim == 3:
+            pixels = colors.convertBitmap565(pixels)
+        return pixels, cx, cy
 
 
 # Pretransform bitmaps to 16bit arrays
@@ -1525,12 +2054,14 @@ class SSD1351:
         """ Converts a Numpy array representing an image with RGB tuples, to a numpy array
         representing an image with 16bits integer coded colors. The returned array may be passed
         to the "drawBitmap() function.
+        RGBA images are blended over black, and whole stacks of frames are converted at once.
 
 
         Parameters
         ----------
         bitmap : image ndarray.
-            Image to be converted from (RGB) tuples to 16bit color
+            Image to be converted from (RGB) tuples to 16bit color: (H,W,3), (H,W,4) with alpha,
+            or a stack of them (N,H,W,3). Images already in 16bit color are returned as they are.
 
         Returns
         --------
@@ -1538,50 +2069,207 @@ class SSD1351:
             Image converted to 16bit color
 
         """
-        # If the image is not transformed to 16bits color
-        if len(bitmap.shape) == 3:
-            bitmap565 = np.zeros_like(bitmap[:,:,0],dtype=np.uint16)
-            for j in range(bitmap.shape[0]):
-                for k in range(bitmap.shape[1]):
-                    bitmap565.itemset((j,k), self.color565(bitmap[j][k]))
-
-        return bitmap565
+        return colors.convertBitmap565(bitmap)
 
 
 #########################################################################################################################
 ######                               FRAMEBUFFER OPTIMIZATION                                                      ######
 #########################################################################################################################
 
+    def clipRect(self, x, y, w, h):
+        """ *NOT PART OF THE API*
+            Clips a rectangle to the screen.
+
+        Returns
+        --------
+        out : four-tuple or None.
+            (x, y, w, h) of the visible part of the rectangle, None if nothing is visible.
+
+        """
+        if x < 0:
+            w += x
+            x = 0
+        if y < 0:
+            h += y
+            y = 0
+        w = min(w, self.SSD1351WIDTH - x)
+        h = min(h, self.SSD1351HEIGHT - y)
+        if w <= 0 or h <= 0:
+            return None
+        return x, y, w, h
+
+
+    def setBuffered(self, v):
+        """ Enables or disables the retained (buffered) drawing mode. While enabled every drawing
+            function only paints the frame_buffer, and nothing reaches the screen until display()
+            is called. Disabling it pushes whatever is still pending.
+
+
+        Parameters
+        ----------
+        v : boolean.
+            TRUE  =>  Drawing goes only to the frame_buffer
+            FALSE =>  Drawing goes straight to the screen
+
+        Returns
+        --------
+        Nothing
+
+        """
+        if self.buffered and not v:
+            self.buffered = False
+            self.display()
+        self.buffered = v
+
+
+    def setAddrWindow(self, x, y, w, h):
+        """ *NOT PART OF THE API*
+            Opens a (w x h) window of the screen's RAM at (x,y), the following data writes
+            fill it left to right, top to bottom.
+        """
+        self.writeCommand(self.CMD_SETCOLUMN)
+        self.writeData([x,x+w-1])
+        self.writeCommand(self.CMD_SETROW)
+        self.writeData([y,y+h-1])
+        self.writeCommand(self.CMD_WRITERAM)
+
+
+    def markDirty(self, x, y, w, h):
+        """ *NOT PART OF THE API*
+            Records that the (already clipped) rectangle of the frame_buffer has changed and must
+            be sent on the next display(). Overlapping or touching rectangles are merged, and when
+            there are more than "max_dirty_rects" the two that grow the least get merged.
+        """
+        x1, y1 = x + w, y + h
+        rects = self.dirty_rects
+        i = 0
+        while i < len(rects):
+            rx, ry, rw, rh = rects[i]
+            if rx <= x1 and x <= rx + rw and ry <= y1 and y <= ry + rh:
+                #They touch, so we swallow it and start again with the bigger rectangle
+                x, y, x1, y1 = min(x, rx), min(y, ry), max(x1, rx + rw), max(y1, ry + rh)
+                del rects[i]
+                i = 0
+            else:
+                i += 1
+        rects.append((x, y, x1 - x, y1 - y))
+
+        while len(rects) > self.max_dirty_rects:
+            best = None
+            for i in range(len(rects)):
+                for j in range(i + 1, len(rects)):
+                    ax, ay, aw, ah = rects[i]
+                    bx, by, bw, bh = rects[j]
+                    ux, uy = min(ax, bx), min(ay, by)
+                    uw, uh = max(ax + aw, bx + bw) - ux, max(ay + ah, by + bh) - uy
+                    growth = uw * uh - aw * ah - bw * bh
+                    if best is None or growth < best[0]:
+                        best = (growth, i, j, (ux, uy, uw, uh))
+            growth, i, j, union = best
+            del rects[j]
+            del rects[i]
+            rects.append(union)
+
+
+    def getDirtyRects(self):
+        """ Returns the regions of the screen that will be transferred on the next display()
+
+
+        Parameters
+        ----------
+        Nothing
+
+
+        Returns
+        --------
+        out : list of four-tuples.
+            List of (x, y, w, h) rectangles, in pixels.
+
+        """
+        return list(self.dirty_rects)
+
+
+    def sendWindow(self, x, y, w, h):
+        """ *NOT PART OF THE API*
+            Sends a rectangle of the frame_buffer to the same place on the screen.
+        """
+        self.setAddrWindow(x, y, w, h)
+
+        #Big-endian 16bit colors, straight from the frame_buffer
+        self.writeData(self.frame_buffer[y:y+h ,x:x+w])
+
+        #Now the screen holds it
+        self.gram_buffer[y:y+h ,x:x+w] = self.frame_buffer[y:y+h ,x:x+w]
+
+
+    def updateRegion(self, x, y, w, h):
+        """ *NOT PART OF THE API*
+            Sends a rectangle of the frame_buffer following the flush strategy. With 'diff' only the
+            pixels that differ from the gram_buffer are sent, in the windows chosen by planWindows().
+        """
+        if self.flush_strategy != 'diff':
+            self.sendWindow(x, y, w, h)
+            return
+
+        changed = self.frame_buffer[y:y+h ,x:x+w] != self.gram_buffer[y:y+h ,x:x+w]
+        for wx, wy, ww, wh in planWindows(changed, self.window_cost, self.pixel_cost):
+            self.sendWindow(x + wx, y + wy, ww, wh)
+
+
+    def display(self, full = False):
+        """ Sends to the screen every region of the frame_buffer painted since the last call
+            (see getDirtyRects()). With the default 'diff' flush strategy only the pixels that
+            actually changed are sent, choosing between a few big windows or many small ones
+            with the transfer cost model (window_cost, pixel_cost). With the 'dirty' strategy
+            each dirty rectangle is sent whole.
+            This is how the drawings done in buffered mode become visible.
+
+
+        Parameters
+        ----------
+        full : boolean.
+            TRUE  =>  The whole frame_buffer is sent in a single transfer, changed or not.
+            default => FALSE
+
+        Returns
+        --------
+        Nothing
+
+        """
+        with self.writing():
+            if full:
+                self.sendWindow(0, 0, self.SSD1351WIDTH, self.SSD1351HEIGHT)
+            else:
+                for rect in self.dirty_rects:
+                    self.updateRegion(*rect)
+            self.dirty_rects = []
+
+    #Same thing, different name
+    flush = display
+
+
 #This is necesary for the suppor with de GFX library
-    def drawFastHLineFB(self, x, y, w, color):
+    def fillRectFB(self, x, y, w, h, fillcolor):
         # Bounds check
-        if x >= self.SSD1351WIDTH or y >= self.SSD1351HEIGHT:
+        rect = self.clipRect(x, y, w, h)
+        if rect is None:
             return
+        x, y, w, h = rect
 
-        # X bounds check
-        if x+w > self.SSD1351WIDTH:
-            w = self.SSD1351WIDTH - x - 1
-        if w < 0:
-            return
+        self.frame_buffer[y:y+h ,x:x+w] = fillcolor
+        self.markDirty(x, y, w, h)
+        return
 
-        self.frame_buffer[x:x+w ,y] = color
+
+#This is necesary for the suppor with de GFX library
+    def drawFastHLineFB(self, x, y, w, color):
+        self.fillRectFB(x, y, w, 1, color)
         return
 
 
 #This is also necesary for the support of the GFX libray
     def drawFastVLineFB(self, x, y, h, color):
-        # Bounds check
-        if x >= self.SSD1351WIDTH or y >= self.SSD1351HEIGHT:
-            return
-
-        # X bounds check
-        if y+h > self.SSD1351HEIGHT:
-            h = self.SSD1351HEIGHT - y - 1
-        if h < 0:
-            return
-
-        #Write the frame_buffer
-        self.frame_buffer[x ,y:y+h] = color
+        self.fillRectFB(x, y, 1, h, color)
         return
 
 
@@ -1599,4 +2287,18 @@ class SSD1351:
 
         if self.frame_buffer.item((y,x)) != color:
             #Now we record the pixel to the frame buffer
-            self.frame_buffer.itemset((y,x),color)
+            self.frame_buffer[y,x] = color
+            self.markDirty(x, y, 1, 1)
+
+
+#The bitmaps are also painted only on the frame buffer
+    def drawBitmapFB(self, bitmap, x, y, src = None):
+        blit = self.blitRegion(bitmap, x, y, src)
+        if blit is None:
+            return
+        pixels, x, y = blit
+        h, w = pixels.shape
+
+        self.frame_buffer[y:y+h ,x:x+w] = pixels
+        self.markDirty(x, y, w, h)
+        return
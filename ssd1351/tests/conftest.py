@@ -0,0 +1,16 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# The modules of the driver import each other by name (import ssd1351,
+# from transport import ...), so their folder goes first on the path.
+#
+# Run the tests from the repository (or the ssd1351 folder) with
+#     python -m pytest ssd1351/tests
+#
+#----------------------------------------------------------------------
+
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
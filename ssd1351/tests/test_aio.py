@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*-
+
+# The asyncio front end: keyed updates and display().
+
+
+import asyncio
+import threading
+
+from aio import AsyncSSD1351
+
+
+
+class FakeDisplay:
+    """ Records the display() calls. block() keeps the worker thread busy until release(). """
+
+    def __init__(self):
+        self.calls = []
+        self.gate = threading.Event()
+
+    def block(self):
+        self.gate.wait(5)
+
+    def release(self):
+        self.gate.set()
+
+    def display(self, full = False):
+        self.calls.append(full)
+
+
+async def settle():
+    for i in range(5):
+        await asyncio.sleep(0)
+
+
+
+def test_superseded_displays_run_once():
+    async def main():
+        oled = FakeDisplay()
+        aoled = AsyncSSD1351(oled)
+        busy = asyncio.ensure_future(aoled.block())
+        await settle()
+        displays = [asyncio.ensure_future(aoled.display()) for i in range(3)]
+        await settle()
+        oled.release()
+        await asyncio.gather(busy, *displays)
+        aoled.close()
+        return oled.calls
+    assert asyncio.run(main()) == [False]
+
+
+def test_a_full_display_is_not_replaced_by_a_partial_one():
+    async def main():
+        oled = FakeDisplay()
+        aoled = AsyncSSD1351(oled)
+        busy = asyncio.ensure_future(aoled.block())
+        await settle()
+        displays = [asyncio.ensure_future(aoled.display(True)), asyncio.ensure_future(aoled.display())]
+        await settle()
+        oled.release()
+        await asyncio.gather(busy, *displays)
+        aoled.close()
+        return oled.calls
+    assert asyncio.run(main()) == [True, False]
+
+
+def test_a_superseded_display_runs_if_the_newer_one_is_cancelled():
+    async def main():
+        oled = FakeDisplay()
+        aoled = AsyncSSD1351(oled)
+        busy = asyncio.ensure_future(aoled.block())
+        await settle()
+        first = asyncio.ensure_future(aoled.display())
+        await settle()
+        second = asyncio.ensure_future(aoled.display())
+        await settle()
+        second.cancel()
+        await settle()
+        oled.release()
+        await asyncio.gather(busy, first)
+        try:
+            await second
+        except asyncio.CancelledError:
+            pass
+        aoled.close()
+        return oled.calls
+    assert asyncio.run(main()) == [False]
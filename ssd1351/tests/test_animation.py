@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+
+# Delta-encoded animations and the players, on the emulated display.
+
+
+import time
+
+import numpy as np
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+
+import ssd1351
+from animation import encodeAnimation, AnimationPlayer, FramePlayer
+from emulator import SSD1351Emulator
+
+
+
+def makeFrames(count = 6, h = 40, w = 50):
+    """ A block moving over a gradient, as 16bit colors. """
+    frames = []
+    for i in range(count):
+        frame = np.tile(np.arange(w, dtype=np.uint16) * 100, (h, 1))
+        frame[5:15, 4 * i:4 * i + 10] = 0xF800
+        frames.append(frame)
+    return frames
+
+
+def newDisplay(buffered = False):
+    emulator = SSD1351Emulator()
+    oled = ssd1351.SSD1351(buffered = buffered, transport = emulator)
+    oled.begin()
+    return oled, emulator
+
+
+
+def test_animation_player_shows_every_frame():
+    frames = makeFrames()
+    for keyframes in (0, 4):
+        animation = encodeAnimation(frames, keyframe_interval = keyframes)
+        for buffered in (False, True):
+            oled, emulator = newDisplay(buffered)
+            player = AnimationPlayer(oled, animation, 3, 7)
+            #Steps, the loop back to the first frame, and jumps
+            for i in list(range(2 * len(frames))) + [4, 1, 5, 5, 0]:
+                player.show(i)
+                assert (emulator.gram[7:47, 3:53] == frames[i % len(frames)]).all()
+
+
+def test_animation_sends_only_the_changes():
+    frames = makeFrames()
+    animation = encodeAnimation(frames)
+    oled, emulator = newDisplay()
+    player = AnimationPlayer(oled, animation)
+    player.step()
+    emulator.resetCounters()
+    player.play(loops = 1)
+    assert emulator.getCounters()['pixels'] < len(frames) * frames[0].size // 4
+
+
+def test_frame_player_shares_the_patches_of_the_animation():
+    frames = makeFrames()
+    animation = encodeAnimation(frames)
+    oled, emulator = newDisplay()
+    player = FramePlayer(oled, frames, fps = 1000)
+    player.queue = queue.Queue()
+    player.produce()
+    items = [player.queue.get() for i in range(len(frames))]
+    for i in range(1, len(frames)):
+        patches = items[i][1]
+        assert len(patches) == len(animation.patches[i])
+        for (x, y, bitmap), (ax, ay, abitmap) in zip(patches, animation.patches[i]):
+            assert (x, y) == (ax, ay)
+            assert (bitmap == abitmap).all()
+
+
+def test_frame_player_follows_a_slow_producer():
+    frames = makeFrames(12)
+    def prepare(frame):
+        time.sleep(0.03)
+        return frame
+    oled, emulator = newDisplay()
+    stats = FramePlayer(oled, frames, fps = 100, prepare = prepare).play()
+    assert stats['frames'] == len(frames)
+    assert stats['dropped'] == 0
+    assert (emulator.gram[:40, :50] == frames[-1]).all()
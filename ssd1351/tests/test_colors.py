@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+# Conversions between (R,G,B) and 16bit colors.
+
+
+import numpy as np
+
+import ssd1351
+from colors import color565, color888, convertBitmap565
+from transport import MemoryTransport
+
+
+
+def test_color565_and_back():
+    assert color565((255, 0, 0)) == 0xF800
+    assert color565((0, 255, 0)) == 0x07E0
+    assert color888(0xFFFF) == (255, 255, 255)
+    colors = np.arange(0x10000, dtype=np.uint16)
+    assert (color565(color888(colors)) == colors).all()
+
+
+def test_convertBitmap565_decides_by_shape():
+    rgb = np.zeros((4, 5, 3), dtype=np.uint8)
+    rgb[..., 0] = 255
+    for dtype in (np.uint8, np.uint16, np.int64, np.float64):
+        converted = convertBitmap565(rgb.astype(dtype))
+        assert converted.shape == (4, 5)
+        assert converted.dtype == np.uint16
+        assert (converted == 0xF800).all()
+    #Already 16bit colors, even if they come as uint8 or int
+    assert (convertBitmap565(np.full((4, 3), 7, dtype=np.uint8)) == 7).all()
+    assert convertBitmap565(np.full((2, 4, 5), 0xF800, dtype=np.uint16)).shape == (2, 4, 5)
+
+
+def test_convertBitmap565_blends_the_alpha():
+    rgba = np.zeros((2, 2, 4), dtype=np.uint8)
+    rgba[..., 2] = 255
+    rgba[0, :, 3] = 255
+    converted = convertBitmap565(rgba, background = (255, 0, 0))
+    assert (converted[0] == 0x001F).all()
+    assert (converted[1] == 0xF800).all()
+
+
+def test_drawBitmap_takes_uint16_rgb():
+    for buffered in (False, True):
+        oled = ssd1351.SSD1351(buffered = buffered, transport = MemoryTransport(record = False))
+        image = np.zeros((10, 10, 3), dtype=np.uint16)
+        image[..., 1] = 255
+        oled.drawBitmap(image, 120, 5)
+        assert (oled.frame_buffer[5:15, 120:] == 0x07E0).all()
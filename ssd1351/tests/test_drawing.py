@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+# The vectorized drawing functions against the pixel by pixel algorithms they replaced (the ones
+# of Adafruit's GFX library), on random shapes partly or completely off the screen. In immediate
+# mode the emulated screen must end up holding the same image as the frame_buffer.
+
+
+import numpy as np
+
+import ssd1351
+from emulator import SSD1351Emulator
+from glcdfont import font5x8
+
+
+SIZE = 128
+
+
+
+class Reference:
+    """ Pixel by pixel drawing on a (128, 128) ndarray. """
+
+    def __init__(self):
+        self.canvas = np.zeros((SIZE, SIZE), dtype=np.uint16)
+
+    def pixel(self, x, y, color):
+        if 0 <= x < SIZE and 0 <= y < SIZE:
+            self.canvas[y, x] = color
+
+    def hline(self, x, y, w, color):
+        for i in range(max(x, 0), min(x + w, SIZE)):
+            self.pixel(i, y, color)
+
+    def vline(self, x, y, h, color):
+        for j in range(max(y, 0), min(y + h, SIZE)):
+            self.pixel(x, j, color)
+
+    def rect(self, x, y, w, h, color):
+        for j in range(max(y, 0), min(y + h, SIZE)):
+            self.hline(x, j, w, color)
+
+    def line(self, x0, y0, x1, y1, color):
+        steep = abs(y1 - y0) > abs(x1 - x0)
+        if steep:
+            x0, y0, x1, y1 = y0, x0, y1, x1
+        if x0 > x1:
+            x0, x1, y0, y1 = x1, x0, y1, y0
+        dx = x1 - x0
+        dy = abs(y1 - y0)
+        err = dx // 2
+        ystep = 1 if y0 < y1 else -1
+        for x in range(x0, x1 + 1):
+            if steep:
+                self.pixel(y0, x, color)
+            else:
+                self.pixel(x, y0, color)
+            err -= dy
+            if err < 0:
+                y0 += ystep
+                err += dx
+
+    def circleSteps(self, r):
+        f, ddF_x, ddF_y, x, y = 1 - r, 1, -2 * r, 0, r
+        while x < y:
+            if f >= 0:
+                y -= 1
+                ddF_y += 2
+                f += ddF_y
+            x += 1
+            ddF_x += 2
+            f += ddF_x
+            yield x, y
+
+    def circle(self, x0, y0, r, color):
+        for x, y in [(0, r), (0, -r), (r, 0), (-r, 0)]:
+            self.pixel(x0 + x, y0 + y, color)
+        self.circleHelper(x0, y0, r, 0xF, color)
+
+    def circleHelper(self, x0, y0, r, corners, color):
+        for x, y in self.circleSteps(r):
+            if corners & 0x4:
+                self.pixel(x0 + x, y0 + y, color)
+                self.pixel(x0 + y, y0 + x, color)
+            if corners & 0x2:
+                self.pixel(x0 + x, y0 - y, color)
+                self.pixel(x0 + y, y0 - x, color)
+            if corners & 0x8:
+                self.pixel(x0 - y, y0 + x, color)
+                self.pixel(x0 - x, y0 + y, color)
+            if corners & 0x1:
+                self.pixel(x0 - y, y0 - x, color)
+                self.pixel(x0 - x, y0 - y, color)
+
+    def fillCircleHelper(self, x0, y0, r, corners, delta, color):
+        for x, y in self.circleSteps(r):
+            if corners & 0x1:
+                self.vline(x0 + x, y0 - y, 2 * y + 1 + delta, color)
+                self.vline(x0 + y, y0 - x, 2 * x + 1 + delta, color)
+            if corners & 0x2:
+                self.vline(x0 - x, y0 - y, 2 * y + 1 + delta, color)
+                self.vline(x0 - y, y0 - x, 2 * x + 1 + delta, color)
+
+    def fillCircle(self, x0, y0, r, color):
+        self.vline(x0, y0 - r, 2 * r + 1, color)
+        self.fillCircleHelper(x0, y0, r, 3, 0, color)
+
+    def roundRect(self, x, y, w, h, r, color):
+        self.hline(x + r, y, w - 2 * r, color)
+        self.hline(x + r, y + h - 1, w - 2 * r, color)
+        self.vline(x, y + r, h - 2 * r, color)
+        self.vline(x + w - 1, y + r, h - 2 * r, color)
+        self.circleHelper(x + r, y + r, r, 1, color)
+        self.circleHelper(x + w - r - 1, y + r, r, 2, color)
+        self.circleHelper(x + w - r - 1, y + h - r - 1, r, 4, color)
+        self.circleHelper(x + r, y + h - r - 1, r, 8, color)
+
+    def fillRoundRect(self, x, y, w, h, r, color):
+        self.rect(x + r, y, w - 2 * r, h, color)
+        self.fillCircleHelper(x + w - r - 1, y + r, r, 1, h - 2 * r - 1, color)
+        self.fillCircleHelper(x + r, y + r, r, 2, h - 2 * r - 1, color)
+
+    def fillTriangle(self, x0, y0, x1, y1, x2, y2, color):
+        (y0, x0), (y1, x1), (y2, x2) = sorted([(y0, x0), (y1, x1), (y2, x2)], key=lambda p: p[0])
+        if y0 == y2:
+            a, b = min(x0, x1, x2), max(x0, x1, x2)
+            self.hline(a, y0, b - a + 1, color)
+            return
+        last = y1 if y1 == y2 else y1 - 1
+        for y in range(y0, y2 + 1):
+            if y <= last:
+                a = x0 + (x1 - x0) * (y - y0) // (y1 - y0) if y1 != y0 else x0
+            else:
+                a = x1 + (x2 - x1) * (y - y1) // (y2 - y1)
+            b = x0 + (x2 - x0) * (y - y0) // (y2 - y0)
+            if a > b:
+                a, b = b, a
+            self.hline(a, y, b - a + 1, color)
+
+    def bitmap(self, image, x, y, src = None):
+        sx, sy, sw, sh = src if src is not None else (0, 0, image.shape[1], image.shape[0])
+        for j in range(sh):
+            for i in range(sw):
+                if 0 <= sy + j < image.shape[0] and 0 <= sx + i < image.shape[1]:
+                    self.pixel(x + i, y + j, image[sy + j, sx + i])
+
+    def char(self, x, y, c, color, bg):
+        for i in range(6):
+            line = font5x8[c][i] if i < 5 else 0
+            for j in range(8):
+                self.pixel(x + i, y + j, color if line & (1 << j) else bg)
+
+
+
+def newDisplay(buffered = False):
+    emulator = SSD1351Emulator()
+    oled = ssd1351.SSD1351(buffered = buffered, transport = emulator)
+    oled.begin()
+    return oled, emulator
+
+
+def check(draw, count, seed):
+    """ Draws "count" random shapes with draw(rng, oled, reference), in immediate and buffered mode,
+        and compares the results with the reference.
+    """
+    for buffered in (False, True):
+        rng = np.random.RandomState(seed)
+        oled, emulator = newDisplay(buffered)
+        reference = Reference()
+        for i in range(count):
+            draw(rng, oled, reference)
+            if i % 50 == 0 or i == count - 1:
+                if buffered:
+                    oled.display()
+                assert (oled.frame_buffer == reference.canvas).all(), 'shape %d' % i
+                assert (emulator.gram == reference.canvas).all(), 'shape %d' % i
+
+
+def coordinate(rng):
+    return int(rng.randint(-80, SIZE + 80))
+
+
+def color(rng):
+    return int(rng.randint(0, 0x10000))
+
+
+
+def test_drawLine():
+    def draw(rng, oled, reference):
+        args = [coordinate(rng) for i in range(4)] + [color(rng)]
+        oled.drawLine(*args)
+        reference.line(*args)
+    check(draw, 3000, 10)
+
+
+def test_fillTriangle():
+    def draw(rng, oled, reference):
+        args = [coordinate(rng) for i in range(6)] + [color(rng)]
+        if rng.rand() < 0.2:
+            args[3] = args[1]        #Flat top or bottom
+        oled.fillTriangle(*args)
+        reference.fillTriangle(*args)
+    check(draw, 1500, 12)
+
+
+def test_circles():
+    def draw(rng, oled, reference):
+        x, y, r, c = coordinate(rng), coordinate(rng), int(rng.randint(0, 90)), color(rng)
+        if rng.rand() < 0.5:
+            oled.drawCircle(x, y, r, c)
+            reference.circle(x, y, r, c)
+        else:
+            oled.fillCircle(x, y, r, c)
+            reference.fillCircle(x, y, r, c)
+    check(draw, 600, 11)
+
+
+def test_roundRects():
+    def draw(rng, oled, reference):
+        x, y, c = coordinate(rng), coordinate(rng), color(rng)
+        w, h = int(rng.randint(1, 150)), int(rng.randint(1, 150))
+        r = int(rng.randint(0, min(w, h) // 2 + 1))
+        if rng.rand() < 0.5:
+            oled.drawRoundRect(x, y, w, h, r, c)
+            reference.roundRect(x, y, w, h, r, c)
+        else:
+            oled.fillRoundRect(x, y, w, h, r, c)
+            reference.fillRoundRect(x, y, w, h, r, c)
+    check(draw, 600, 11)
+
+
+def test_drawBitmap_clips_and_cuts():
+    def draw(rng, oled, reference):
+        image = rng.randint(0, 0x10000, size=(int(rng.randint(1, 60)), int(rng.randint(1, 60)))).astype(np.uint16)
+        x, y = int(rng.randint(-70, SIZE + 10)), int(rng.randint(-70, SIZE + 10))
+        src = None
+        if rng.rand() < 0.7:
+            src = (int(rng.randint(-20, 60)), int(rng.randint(-20, 60)), int(rng.randint(0, 70)), int(rng.randint(0, 70)))
+        oled.drawBitmap(image, x, y, src)
+        reference.bitmap(image, x, y, src)
+    check(draw, 400, 25)
+
+
+def test_write_matches_drawing_every_character():
+    rng = np.random.RandomState(14)
+    letters = [chr(c) for c in range(32, 127)] + ['\n'] * 5
+    for buffered in (False, True):
+        oled, emulator = newDisplay(buffered)
+        reference = Reference()
+        x = y = 0
+        for i in range(40):
+            text = ''.join(rng.choice(letters, size=int(rng.randint(1, 60))))
+            c, bg = color(rng), color(rng)
+            oled.write(text, c, bg)
+            #The rules of write(), one character at a time
+            for letter in text:
+                if letter == '\n':
+                    x, y = 0, y + 8
+                    continue
+                reference.char(x, y, ord(letter), c, bg)
+                x += 6
+                if x > SIZE - 6:
+                    x, y = 0, y + 8
+                    if y > SIZE - 8:
+                        y = 0
+            if buffered:
+                oled.display()
+            assert (oled.frame_buffer == reference.canvas).all()
+            assert (emulator.gram == reference.canvas).all()
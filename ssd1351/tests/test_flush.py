@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+# Flush strategies of the frame_buffer: planWindows() and display().
+
+
+import numpy as np
+
+import ssd1351
+from ssd1351 import planWindows, planCost
+from emulator import SSD1351Emulator
+
+
+WINDOW_COST = ssd1351.SSD1351.WINDOW_COST
+PIXEL_COST = ssd1351.SSD1351.PIXEL_COST
+
+
+
+def covered(windows, shape):
+    """ Mask of the pixels sent by a list of windows. """
+    mask = np.zeros(shape, dtype=bool)
+    for x, y, w, h in windows:
+        assert w > 0 and h > 0
+        assert x >= 0 and y >= 0 and x + w <= shape[1] and y + h <= shape[0]
+        mask[y:y+h, x:x+w] = True
+    return mask
+
+
+def outline(r):
+    """ Mask of a circle outline of radius r, centered on a (2r+1, 2r+1) mask. """
+    ys, xs = np.mgrid[-r:r+1, -r:r+1]
+    d = np.hypot(xs, ys)
+    return (d > r - 1) & (d <= r)
+
+
+def newDisplay(buffered = False):
+    emulator = SSD1351Emulator()
+    oled = ssd1351.SSD1351(buffered = buffered, transport = emulator)
+    oled.begin()
+    emulator.resetCounters()
+    return oled, emulator
+
+
+
+def test_planWindows_nothing_changed():
+    assert planWindows(np.zeros((16, 16), dtype=bool), WINDOW_COST, PIXEL_COST) == []
+
+
+def test_planWindows_merges_neighbour_spans():
+    changed = np.zeros((16, 16), dtype=bool)
+    changed[3, 2:6] = True
+    changed[4, 4:9] = True
+    changed[5, 1:3] = True
+    assert planWindows(changed, WINDOW_COST, PIXEL_COST) == [(1, 3, 8, 3)]
+
+
+def test_planWindows_keeps_distant_rows_apart():
+    changed = np.zeros((128, 128), dtype=bool)
+    changed[0, 10:12] = True
+    changed[120, 50:52] = True
+    assert planWindows(changed, WINDOW_COST, PIXEL_COST) == [(10, 0, 2, 1), (50, 120, 2, 1)]
+
+
+def test_planWindows_follows_the_cost_model():
+    changed = np.zeros((32, 32), dtype=bool)
+    changed[::4, ::4] = True
+    #Free windows: nothing but the changed pixels is sent
+    free = planWindows(changed, 0.0, PIXEL_COST)
+    assert (covered(free, changed.shape) == changed).all()
+    assert sum(w * h for x, y, w, h in free) == changed.sum()
+    #Expensive windows: a single one
+    assert planWindows(changed, 1.0, PIXEL_COST) == [(0, 0, 29, 29)]
+
+
+def test_planWindows_sends_outlines_as_columns():
+    changed = outline(60)
+    windows = planWindows(changed, WINDOW_COST, PIXEL_COST)
+    assert (covered(windows, changed.shape) >= changed).all()
+    #Far less than the bounding box, and cheaper by the cost model
+    assert sum(w * h for x, y, w, h in windows) < changed.size // 2
+    box = [(0, 0, changed.shape[1], changed.shape[0])]
+    assert planCost(windows, WINDOW_COST, PIXEL_COST) < planCost(box, WINDOW_COST, PIXEL_COST)
+
+
+def test_planWindows_covers_every_change():
+    rng = np.random.RandomState(3)
+    for i in range(200):
+        h, w = rng.randint(1, 129, size=2)
+        changed = rng.rand(h, w) < rng.choice([0.001, 0.01, 0.1, 0.5])
+        if rng.rand() < 0.3:
+            changed[:, w // 4: 3 * w // 4] = False
+        windows = planWindows(changed, WINDOW_COST, PIXEL_COST)
+        assert (covered(windows, changed.shape) >= changed).all()
+
+
+def test_immediate_outlines_send_less_than_their_box():
+    oled, emulator = newDisplay()
+    for i in range(12):
+        oled.drawCircle(64, 64, 5 + 5 * i, 0xF800 + i)
+    assert (emulator.gram == oled.frame_buffer).all()
+    assert emulator.getCounters()['bytes'] < 60000
+
+
+def test_flush_strategies_match_a_full_flush():
+    rng = np.random.RandomState(7)
+    for strategy in ('diff', 'dirty'):
+        oled, emulator = newDisplay(buffered = True)
+        oled.flush_strategy = strategy
+        reference, full = newDisplay(buffered = True)
+        for frame in range(20):
+            for shape in range(rng.randint(1, 6)):
+                x, y, w, h = rng.randint(-20, 140, size=4)
+                color = int(rng.randint(0, 0x10000))
+                for target in (oled, reference):
+                    kind = frame * 7 + shape
+                    if kind % 3 == 0:
+                        target.fillRect(x, y, w, h, color)
+                    elif kind % 3 == 1:
+                        target.drawCircle(x, y, w // 2, color)
+                    else:
+                        target.drawLine(x, y, w, h, color)
+            oled.display()
+            reference.display(True)
+            assert (emulator.gram == full.gram).all()
+            assert (emulator.gram == oled.frame_buffer).all()
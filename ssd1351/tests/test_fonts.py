@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+
+# Loading fonts: BDF files as they come from the wild.
+
+
+import numpy as np
+import pytest
+
+from fonts import loadBDF
+
+
+BDF = b"""STARTFONT 2.1
+COMMENT Copyright \xa9 1991 J\xfcrgen Someone
+FONT -misc-test-medium-r-normal--4-40-75-75-c-40-iso8859-1
+SIZE 4 75 75
+%(box)s
+STARTPROPERTIES 3
+COPYRIGHT "\xa9 1991"
+FONT_ASCENT 3
+FONT_DESCENT 1
+ENDPROPERTIES
+CHARS 2
+STARTCHAR A
+ENCODING 65
+DWIDTH 4 0
+BBX 3 3 0 0
+BITMAP
+40
+A0
+E0
+ENDCHAR
+STARTCHAR space
+ENCODING 32
+DWIDTH 4 0
+%(bbx)s
+BITMAP
+ENDCHAR
+ENDFONT
+"""
+
+
+def writeBDF(tmpdir, box = b'FONTBOUNDINGBOX 3 4 0 -1', bbx = b'BBX 0 0 0 0'):
+    path = tmpdir.join('test.bdf')
+    path.write_binary(BDF % {b'box': box, b'bbx': bbx})
+    return str(path)
+
+
+
+def test_loadBDF_reads_latin1_files(tmpdir):
+    font = loadBDF(writeBDF(tmpdir))
+    assert font.height == 4
+    mask = font.render([font.glyphIndex('A')])
+    assert (mask[:3, :3] == np.array([[0, 1, 0], [1, 0, 1], [1, 1, 1]], dtype=bool)).all()
+    assert not mask[3].any()
+
+
+def test_loadBDF_without_a_bounding_box(tmpdir):
+    #The space has no BBX, the size of the font comes from the glyphs that have one
+    font = loadBDF(writeBDF(tmpdir, box = b'', bbx = b''))
+    assert font.glyphIndex('A') is not None
+    assert font.glyphIndex(' ') is not None
+
+
+def test_loadBDF_without_any_size(tmpdir):
+    path = tmpdir.join('nothing.bdf')
+    path.write_binary(b'STARTFONT 2.1\nCHARS 1\nSTARTCHAR space\nENCODING 32\nDWIDTH 4 0\nBITMAP\nENDCHAR\nENDFONT\n')
+    with pytest.raises(ValueError):
+        loadBDF(str(path))
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+
+# What the driver hands to the transports: bytes, and the DC pin only when it changes.
+
+
+import numpy as np
+
+import ssd1351
+from transport import MemoryTransport, Transport
+
+
+
+def test_transports_only_move_dc_and_write_bytes():
+    assert not hasattr(Transport, 'writeCommand')
+    assert not hasattr(Transport, 'writeData')
+
+
+def test_commands_go_low_and_data_goes_high():
+    transport = MemoryTransport()
+    oled = ssd1351.SSD1351(transport = transport)
+    oled.writeCommand(oled.CMD_SETCOLUMN)
+    oled.writeData([0, 127])
+    oled.writeCommand(oled.CMD_WRITERAM)
+    assert transport.log == [
+        ('write', bytes(bytearray([oled.CMD_SETCOLUMN]))),
+        ('dc', True),
+        ('write', bytes(bytearray([0, 127]))),
+        ('dc', False),
+        ('write', bytes(bytearray([oled.CMD_WRITERAM]))),
+    ]
+
+
+def test_dc_only_moves_when_it_changes():
+    transport = MemoryTransport()
+    oled = ssd1351.SSD1351(transport = transport)
+    oled.startWrite()
+    oled.writeData(1)
+    oled.writeData(2)
+    oled.endWrite()
+    oled.writeData(3)
+    assert transport.log == [
+        ('dc', True),
+        ('write', bytes(bytearray([1, 2]))),
+        ('write', bytes(bytearray([3]))),
+    ]
+
+
+class FailingTransport(MemoryTransport):
+    """ Raises on the first "failures" transfers. """
+
+    def __init__(self, failures = 1):
+        MemoryTransport.__init__(self)
+        self.failures = failures
+
+    def writeBytes(self, data):
+        if self.failures > 0:
+            self.failures -= 1
+            raise IOError('SPI transfer failed')
+        MemoryTransport.writeBytes(self, data)
+
+
+def test_a_failed_transfer_doesnt_leave_the_writes_queued():
+    for draw in (lambda oled: oled.fillRect(0, 0, 10, 10, 0xF800),
+                 lambda oled: oled.drawBitmap(np.zeros((4, 4), dtype=np.uint16), 0, 0),
+                 lambda oled: oled.drawChar(0, 0, 'A'),
+                 lambda oled: oled.startScroll(),
+                 lambda oled: (oled.setBuffered(True), oled.fillRect(0, 0, 10, 10, 0x001F), oled.display())):
+        transport = FailingTransport()
+        oled = ssd1351.SSD1351(transport = transport)
+        try:
+            draw(oled)
+        except IOError:
+            pass
+        else:
+            assert False, 'the transport did not fail'
+        assert oled.write_depth == 0
+        assert oled.queue == []
+
+        #The next drawing goes out right away, and only with its own bytes
+        oled.setBuffered(False)
+        transport.clear()
+        oled.writeCommand(oled.CMD_WRITERAM)
+        assert transport.log[-1] == ('write', bytes(bytearray([oled.CMD_WRITERAM])))
+        assert len([entry for entry in transport.log if entry[0] == 'write']) == 1
+
+
+def test_writing_groups_nest():
+    transport = MemoryTransport()
+    oled = ssd1351.SSD1351(transport = transport)
+    with oled.writing():
+        oled.writeData(1)
+        with oled.writing():
+            oled.writeData(2)
+        assert transport.log == []
+        oled.writeData(3)
+    assert transport.log == [('dc', True), ('write', bytes(bytearray([1, 2, 3])))]
@@ -0,0 +1,215 @@
+# -*- coding: utf-8 -*-
+
+#----------------------------------------------------------------------
+# transport.py from https://github.com/saidalvarado/ssd1351
+#
+# The ways the SSD1351 driver can talk to the display.
+#
+# Every transport knows how to do three things: send bytes, move the DC
+# (data/command) pin and reset the display. The driver decides the level
+# of the DC pin for every transfer, and only moves it when it changes.
+#
+#   SpidevTransport  => The real thing, spidev + wiringpi2 on the RaspberryPi
+#   MemoryTransport  => Keeps everything in memory, no hardware needed.
+#                       Useful to run and measure the driver anywhere.
+#
+#----------------------------------------------------------------------
+
+
+import numpy as np
+import numbers
+import time
+
+
+
+
+
+# Big-endian 16bit colors, the order the screen wants them
+def wireBytes(bitmap):
+    """ Returns the pixels of a 16bit color array as a flat array of bytes in the order they are sent
+        to the screen (big-endian). No copy is made if the array is already contiguous big-endian.
+    """
+    return np.ascontiguousarray(bitmap, dtype='>u2').reshape(-1).view(np.uint8)
+
+
+# Any kind of data the driver sends, as bytes
+def toBytes(data):
+    """ Converts an int, a list of ints, a 16bit color ndarray or any bytes-like object to a
+        bytes-like object (without copying it, when possible).
+    """
+    if isinstance(data, numbers.Integral):
+        return bytearray([data & 0xFF])
+    if type(data) == list:
+        return bytearray([int(v) & 0xFF for v in data])
+    if isinstance(data, np.ndarray) and data.dtype != np.uint8:
+        return wireBytes(data)
+    return data
+
+
+# Several pieces of data as a single block of bytes
+def joinBytes(segments):
+    """ Concatenates a list of ints lists, ndarrays and bytes-like objects into a uint8 ndarray. """
+    blocks = []
+    for data in segments:
+        data = toBytes(data)
+        if not isinstance(data, np.ndarray):
+            data = np.frombuffer(bytes(data), dtype=np.uint8)
+        blocks.append(data)
+    return np.concatenate(blocks)
+
+
+
+
+
+# Class definition intended for GPIO manipulation.
+class GPIO:
+    def __init__(self):
+        import wiringpi2
+        self.gpio = wiringpi2.GPIO(wiringpi2.GPIO.WPI_MODE_PINS)
+        self.setup = self.wiringpi2_setup
+        self.output = self.gpio.digitalWrite
+        self.input = self.gpio.digitalRead
+        self.OUT = self.gpio.OUTPUT
+        self.IN = self.gpio.INPUT
+        self.HIGH = self.gpio.HIGH
+        self.LOW = self.gpio.LOW
+        self.PUD_UP = self.gpio.PUD_UP
+        self.PUD_DOWN = self.gpio.PUD_DOWN
+        self.PUD_OFF = self.gpio.PUD_OFF
+
+    def wiringpi2_setup(self, channel, direction, pull_up_down=None):
+        self.gpio.pinMode(channel, direction)
+        if pull_up_down is None: pull_up_down = self.gpio.PUD_OFF
+        self.gpio.pullUpDnControl(channel, pull_up_down)
+
+
+
+
+
+
+class Transport:
+    """ Base class of the transports. The subclasses implement setDC(), writeBytes() and reset().
+
+        The DC pin is LOW by default. The driver pulls it HIGH before sending data and LOW
+        before sending commands (see SSD1351.sendQueue()).
+    """
+
+    def setDC(self, level):
+        """ Moves the DC pin. level is True (HIGH) for data, False (LOW) for commands. """
+        raise NotImplementedError
+
+    def writeBytes(self, data):
+        """ Sends bytes through the bus, without touching the DC pin. """
+        raise NotImplementedError
+
+    def reset(self):
+        """ Resets the display. """
+        raise NotImplementedError
+
+
+
+
+
+
+class SpidevTransport(Transport):
+    """ Talks to the display through the SPI port (spidev) and the GPIO pins (wiringpi2).
+
+        Device name will be /dev/spidev-{bus}.{device}
+        dc_pin is the data/commmand pin.  This line is HIGH for data, LOW for command.
+        reset is normally HIGH, and pulled LOW to reset the display
+    """
+
+    def __init__(self, bus=0, device=0, dc_pin=3, reset_pin=2, speed=16000000, spiBufferSize = 4096):
+        import spidev
+        # Pins assigment
+        self.dc_pin = dc_pin
+        self.reset_pin = reset_pin
+        # SPI port configuration
+        self.spi = spidev.SpiDev()
+        self.spi.open(bus, device)
+        self.spi.max_speed_hz = speed #We set the bus to 16Mhz
+        self.spi.mode = 3 # necessary!
+        self.spi_buffer_size = spiBufferSize
+        #Newer spidev versions take any buffer and split the transfers by themselves
+        self.spi_writebytes2 = getattr(self.spi, 'writebytes2', None)
+        # GPIO port configuration. (The defition is at the start of the code)
+        self.gpio = GPIO()
+        self.gpio.setup(self.reset_pin, self.gpio.OUT)
+        self.gpio.output(self.reset_pin, self.gpio.HIGH)
+        self.gpio.setup(self.dc_pin, self.gpio.OUT)
+        self.gpio.output(self.dc_pin, self.gpio.LOW)
+
+    def setDC(self, level):
+        self.gpio.output(self.dc_pin, self.gpio.HIGH if level else self.gpio.LOW)
+
+    def reset(self):
+        self.gpio.output(self.reset_pin, self.gpio.LOW)
+        time.sleep(0.010) # 10ms
+        self.gpio.output(self.reset_pin, self.gpio.HIGH)
+
+    def writeBytes(self, data):
+
+        if type(data) == list:
+            self.spi.writebytes(data)
+            return
+
+        data = toBytes(data)
+
+        if self.spi_writebytes2 is not None:
+            self.spi_writebytes2(data)
+            return
+
+        #We try to get around the limitation of the 4096 buffer size of the spidev module
+        if not isinstance(data, np.ndarray):
+            data = np.frombuffer(data, dtype=np.uint8)
+        for i in range(0, len(data), self.spi_buffer_size):
+            self.spi.writebytes(data[i:i+self.spi_buffer_size].tolist())
+
+
+
+
+
+
+class MemoryTransport(Transport):
+    """ Keeps in memory everything the driver does, instead of sending it to a display.
+
+        log is a list with one entry per operation:
+            ('dc', level)     The DC pin was moved (True => HIGH)
+            ('write', data)   Bytes were sent, as a bytes object
+            ('reset',)        The display was reset
+
+        With record = False nothing is kept, the transport just swallows the data.
+    """
+
+    def __init__(self, record = True):
+        self.record = record
+        self.log = []
+        self.dc = False
+
+    def setDC(self, level):
+        self.dc = bool(level)
+        if self.record:
+            self.log.append(('dc', self.dc))
+
+    def reset(self):
+        if self.record:
+            self.log.append(('reset',))
+
+    def writeBytes(self, data):
+        if self.record:
+            self.log.append(('write', bytes(bytearray(toBytes(data)))))
+
+    def clear(self):
+        """ Forgets everything recorded so far. """
+        self.log = []
+
+    def getData(self):
+        """ Returns every byte sent while the DC pin was HIGH, joined in a single bytes object. """
+        dc = False
+        data = []
+        for entry in self.log:
+            if entry[0] == 'dc':
+                dc = entry[1]
+            elif entry[0] == 'write' and dc:
+                data.append(entry[1])
+        return b''.join(data)